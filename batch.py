@@ -0,0 +1,171 @@
+import os
+import re
+import csv
+import sys
+import json
+import time
+import asyncio
+import hashlib
+import argparse
+
+from prompts import canonical_request, build_recipe_prompt
+from generator import get_recipe, get_structured_recipe
+from recipe_parser import parse_recipe, format_recipe
+from recipe_store import recipe_store, recipe_record
+from nutrition import recipe_nutrition
+from metrics import metrics
+
+# Headless bulk generation.
+# Usage: python batch.py dishes.csv -o recipes.jsonl --concurrency 8
+# Input rows (CSV columns or JSONL keys): id, mode, dish, ingredients, dietary, allergens, season, region.
+# Rerunning with the same output file skips rows that already completed successfully.
+
+
+def read_rows(path):
+    if path.endswith(".jsonl"):
+        with open(path, encoding="utf-8") as f:
+            return [json.loads(line) for line in f if line.strip()]
+    with open(path, newline="", encoding="utf-8") as f:
+        return list(csv.DictReader(f))
+
+
+def split_field(value):
+    if isinstance(value, list):
+        return value
+    return [part for part in re.split(r"[;|,]", value or "") if part.strip()]
+
+
+def row_request(row):
+    mode = (row.get("mode") or "").strip().lower()
+    if mode in ("ingredients", "by ingredients") or (not mode and row.get("ingredients")):
+        # Split like the other list fields, so "eggs;flour" and "eggs, flour" give the same prompt
+        mode, user_input = "By Ingredients", ", ".join(split_field(row.get("ingredients")))
+    else:
+        mode, user_input = "By Dish Name", row.get("dish") or row.get("name")
+    if not user_input or not user_input.strip():
+        raise ValueError("row has no dish name or ingredients")
+    return canonical_request(
+        mode,
+        user_input,
+        split_field(row.get("dietary")),
+        ", ".join(split_field(row.get("allergens"))),
+        row.get("season"),
+        row.get("region"),
+    )
+
+
+def row_id(row, prompt):
+    return str(row.get("id") or hashlib.sha1(prompt.encode("utf-8")).hexdigest()[:16])
+
+
+def completed_ids(path):
+    done = set()
+    if not os.path.exists(path):
+        return done
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # A crash can leave a truncated last line; that row is simply generated again
+                continue
+            if not record.get("error"):
+                done.add(record["id"])
+    return done
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+async def generate_one(job, structured):
+    start = time.perf_counter()
+    if structured:
+        parsed = await get_structured_recipe(build_recipe_prompt(job["request"], structured=True), fallback_prompt=job["prompt"])
+        recipe = format_recipe(parsed)
+    else:
+        recipe = await get_recipe(job["prompt"])
+        parsed = parse_recipe(recipe)
+    await asyncio.get_running_loop().run_in_executor(None, recipe_store.add, recipe_record(job["request"], recipe, parsed))
+    return {
+        "id": job["id"],
+        "prompt": job["prompt"],
+        "title": parsed.title,
+        "recipe": recipe,
+        "ingredients": parsed.ingredients,
+        "steps": [{"text": step.text, "seconds": step.seconds} for step in parsed.steps],
+        "servings": parsed.servings,
+        "nutrition": parsed.nutrition or recipe_nutrition(parsed.ingredients, parsed.servings)[0],
+        "seconds": round(time.perf_counter() - start, 3),
+    }
+
+
+async def run_batch(jobs, output, concurrency, structured=False):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    failures = 0
+
+    async def worker(job):
+        nonlocal failures
+        async with semaphore:
+            try:
+                record = await generate_one(job, structured)
+                latencies.append(record["seconds"])
+            except Exception as e:
+                failures += 1
+                record = {"id": job["id"], "prompt": job["prompt"], "error": f"{type(e).__name__}: {e}"}
+        # Written as soon as each row finishes so a crash loses at most the rows still in flight
+        output.write(json.dumps(record, ensure_ascii=False) + "\n")
+        output.flush()
+
+    await asyncio.gather(*(worker(job) for job in jobs))
+    return latencies, failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate recipes in bulk from a CSV or JSONL file")
+    parser.add_argument("input", help="CSV or JSONL file of dishes or ingredient lists")
+    parser.add_argument("-o", "--output", default="recipes.jsonl", help="JSONL file to append results to")
+    parser.add_argument("-c", "--concurrency", type=int, default=4, help="maximum concurrent Gemini calls")
+    parser.add_argument("--structured", action="store_true", help="request schema-constrained JSON output")
+    args = parser.parse_args(argv)
+
+    done = completed_ids(args.output)
+    jobs, skipped, invalid = [], 0, 0
+    seen = set()
+    for number, row in enumerate(read_rows(args.input), start=1):
+        try:
+            request = row_request(row)
+        except ValueError as e:
+            print(f"row {number}: {e}", file=sys.stderr)
+            invalid += 1
+            continue
+        prompt = build_recipe_prompt(request)
+        job_id = row_id(row, prompt)
+        if job_id in done or job_id in seen:
+            skipped += 1
+            continue
+        seen.add(job_id)
+        jobs.append({"id": job_id, "request": request, "prompt": prompt})
+
+    print(f"{len(jobs)} to generate, {skipped} already done, {invalid} invalid")
+    start = time.perf_counter()
+    with open(args.output, "a", encoding="utf-8") as output:
+        latencies, failures = asyncio.run(run_batch(jobs, output, args.concurrency, args.structured))
+    elapsed = time.perf_counter() - start
+
+    succeeded = len(latencies)
+    rate = succeeded / elapsed * 60 if elapsed else 0.0
+    print(f"{succeeded} succeeded, {failures} failed in {elapsed:.1f}s ({rate:.1f} recipes/min)")
+    print(f"latency p50 {percentile(latencies, 50):.2f}s, p95 {percentile(latencies, 95):.2f}s")
+    if metrics.enabled:
+        for stage, summary in metrics.snapshot()["stages"].items():
+            print(f"  {stage:<22} n={summary['count']:<6} p50 <= {summary['p50']}s, p95 <= {summary['p95']}s, p99 <= {summary['p99']}s")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,76 @@
+import os
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import nutrition
+from nutrition import parse_ingredient_lists, aggregate_nutrition, parse_ingredient, NUTRIENT_TABLE, NUTRIENTS, DEFAULT_SERVINGS
+
+# Per-serving nutrition for a batch of recipes: the vectorized pass against a per-recipe Python loop.
+# Usage: python benchmarks/bench_nutrition.py --recipes 10000
+
+AMOUNTS = ["1", "2", "3", "1/2", "1 1/2", "¼", "2-3", "200", "500", "0.5"]
+UNITS = ["cup", "cups", "tbsp", "tsp", "g", "oz", "lb", "ml", "cloves", "", "", ""]
+SUFFIXES = ["", "", ", chopped", ", diced", " (optional)", ", to serve", " to taste"]
+
+
+def random_line(rng, aliases):
+    if rng.random() < 0.05:
+        return f"{rng.choice(AMOUNTS)} {rng.choice(UNITS)} mystery ingredient {rng.randint(0, 999)}"
+    return f"{rng.choice(AMOUNTS)} {rng.choice(UNITS)} {rng.choice(aliases)}{rng.choice(SUFFIXES)}".replace("  ", " ")
+
+
+def per_recipe_loop(foods, grams, lengths, servings):
+    # Baseline: the same aggregation written as a Python loop over recipes and their ingredient lines
+    table = NUTRIENT_TABLE.tolist()
+    foods, grams = foods.tolist(), grams.tolist()
+    results = []
+    offset = 0
+    for length, count in zip(lengths.tolist(), servings):
+        totals = [0.0] * len(NUTRIENTS)
+        for food, weight in zip(foods[offset:offset + length], grams[offset:offset + length]):
+            if food >= 0:
+                row = table[food]
+                for column in range(len(totals)):
+                    totals[column] += row[column] * weight
+        offset += length
+        results.append([value / (count or DEFAULT_SERVINGS) for value in totals])
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark batch nutrition computation")
+    parser.add_argument("--recipes", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    aliases = sorted(nutrition._ALIASES)
+    ingredient_lists = [[random_line(rng, aliases) for _ in range(rng.randint(5, 15))] for _ in range(args.recipes)]
+    servings = [rng.choice([None, 2, 4, 6]) for _ in range(args.recipes)]
+    lines = sum(len(lines) for lines in ingredient_lists)
+
+    parse_ingredient.cache_clear()
+    start = time.perf_counter()
+    foods, grams, lengths = parse_ingredient_lists(ingredient_lists)
+    parse_time = time.perf_counter() - start
+    print(f"{args.recipes} recipes, {lines} ingredient lines: parsed in {parse_time * 1e3:.0f} ms ({parse_time / lines * 1e6:.1f} us/line)")
+
+    start = time.perf_counter()
+    values, coverage = aggregate_nutrition(foods, grams, lengths, servings)
+    vectorized = time.perf_counter() - start
+    start = time.perf_counter()
+    baseline = per_recipe_loop(foods, grams, lengths, servings)
+    loop = time.perf_counter() - start
+    print(f"per-serving totals: vectorized {vectorized * 1e3:.1f} ms, per-recipe loop {loop * 1e3:.1f} ms "
+          f"({loop / vectorized:.0f}x), mean coverage {coverage.mean():.0%}")
+
+    worst = max(abs(a - b) for row, expected in zip(values.tolist(), baseline) for a, b in zip(row, expected))
+    print(f"max difference from the loop: {worst:.2e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+import os
+import re
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from recipe_parser import RecipeParser, parse_recipe, get_placeholder_image
+
+# Compares the single-pass RecipeParser with the original regex extraction functions.
+# Usage: python benchmarks/bench_parser.py --repeat 20
+
+
+# Original implementations, kept verbatim as the baseline
+def legacy_extract_steps_and_times(recipe_text):
+    steps = []
+    step_pattern = r"Step \d+:.*?(\([^)]+\))"
+    matches = re.finditer(step_pattern, recipe_text, re.DOTALL)
+    for match in matches:
+        step_text = match.group(0)
+        time_text = match.group(1).strip("()")
+        minutes = 0
+        if "minute" in time_text.lower():
+            num = re.search(r"\d+", time_text)
+            if num:
+                minutes = int(num.group())
+        elif "second" in time_text.lower():
+            num = re.search(r"\d+", time_text)
+            if num:
+                minutes = int(num.group()) / 60
+        image_url = get_placeholder_image(step_text)
+        steps.append({"text": step_text, "time_minutes": minutes, "image_url": image_url})
+    return steps
+
+
+def legacy_extract_ingredients(recipe_text):
+    ingredients = []
+    ingredients_pattern = r"Ingredients:.*?(?=(?:Step \d+|Nutritional Information|$))"
+    match = re.search(ingredients_pattern, recipe_text, re.DOTALL)
+    if match:
+        ingredients_text = match.group(0)
+        items = re.split(r",\s*|\n", ingredients_text)
+        for item in items:
+            item = item.strip()
+            if item and not item.lower().startswith("ingredients:"):
+                ingredients.append(item)
+    return ingredients
+
+
+INLINE_RECIPE = """Dish: Vegetable Curry
+Ingredients: 2 cups rice, 1 onion, 2 carrots, 1 cup peas, 400 ml coconut milk, 2 tbsp curry paste, 1 tsp salt
+Nutritional Information: 420 kcal, Protein: 9 g, Carbohydrates: 61 g, Fat: 16 g, Fiber: 7 g
+Step 1: Rinse the rice and start it cooking (20 minutes)
+Step 2: Chop the onion and carrots (5 minutes)
+Step 3: Fry the onion with the curry paste (3 minutes)
+Step 4: Add carrots, peas and coconut milk and simmer (15 minutes)
+Step 5: Season with salt and serve over the rice (30 seconds)
+"""
+
+MARKDOWN_RECIPE = """## Classic Chocolate Cake
+
+**Ingredients:**
+
+* 2 cups all-purpose flour
+* 2 cups sugar
+* 3/4 cup unsweetened cocoa powder
+* 2 teaspoons baking soda
+* 1 teaspoon salt
+* 2 large eggs
+* 1 cup buttermilk
+* 1/2 cup vegetable oil
+* 1 onion, finely chopped
+
+**Nutritional Information (per serving):**
+
+* Calories: 350
+* Protein: 5g
+* Fat: 12g
+* Carbohydrates: 58g
+* Iron: 2mg
+
+**Instructions:**
+
+**Step 1:** Preheat oven to 350°F (175°C) and grease two pans. (10 minutes)
+**Step 2:** Whisk together the flour, sugar, cocoa, baking soda and salt. (5 minutes)
+**Step 3:** Beat in the eggs, buttermilk and oil
+until smooth. (3 minutes)
+**Step 4:** Bake for 30-35 minutes.
+**Step 5:** Let cool completely. (1 hour)
+
+**Tips:**
+* Serve with whipped cream.
+"""
+
+# Duration phrasings with mixed fractions and compound units
+DURATIONS_RECIPE = """Dish: Braised Short Ribs
+Ingredients: 2 lb short ribs, 1 onion, 2 cups red wine, 2 cups beef stock
+Step 1: Brown the ribs on all sides (8-10 minutes)
+Step 2: Simmer in the wine and stock (about 1 1/2 hours)
+Step 3: Braise in the oven 1 hour 30 minutes
+Step 4: Rest the meat 1 hr, 15 mins before slicing
+Step 5: Reduce the sauce for 2 minutes and 30 seconds
+Step 6: Leave to cool (1/2 hour)
+"""
+
+
+def build_corpus():
+    long_recipe = MARKDOWN_RECIPE + "".join(f"Step {i}: Stir the sauce gently and keep warm ({i % 50 + 1} minutes)\n" for i in range(6, 400))
+    return {
+        "inline": INLINE_RECIPE,
+        "markdown": MARKDOWN_RECIPE,
+        "mixed durations": DURATIONS_RECIPE,
+        "long (400 steps)": long_recipe,
+        # Adversarial inputs for the lazy DOTALL step pattern
+        "steps without times": "Ingredients: flour, water\n" + "".join(f"Step {i}: Knead the dough well\n" for i in range(1, 800)),
+        "unclosed parenthesis": "Ingredients: flour\n" + "".join(f"Step {i}: Mix (until smooth\n" for i in range(1, 300)),
+        "single 100 KB line": "Ingredients: " + "salt, " * 10000 + "Step 1: " + "stir " * 10000,
+    }
+
+
+def bench(fn, text, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(text)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def legacy(text):
+    legacy_extract_steps_and_times(text)
+    legacy_extract_ingredients(text)
+
+
+def streamed(text, chunk_size=64):
+    parser = RecipeParser()
+    for i in range(0, len(text), chunk_size):
+        parser.feed(text[i:i + chunk_size])
+    parser.close()
+    return parser.recipe
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark recipe parsing")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'corpus':<24}{'size':>10}{'legacy':>14}{'parse_recipe':>14}{'streamed':>14}{'speedup':>10}")
+    for name, text in build_corpus().items():
+        old = bench(legacy, text, args.repeat)
+        new = bench(parse_recipe, text, args.repeat)
+        chunked = bench(streamed, text, args.repeat)
+        print(f"{name:<24}{len(text):>10}{old * 1e3:>12.3f}ms{new * 1e3:>12.3f}ms{chunked * 1e3:>12.3f}ms{old / new:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+import os
+import sys
+import json
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from recipe_parser import extract_steps_and_times, extract_ingredients, get_placeholder_image, generate_shopping_list
+from corpus import make_corpus
+
+# Micro-benchmarks for the recipe helpers app.py calls on every generation, over a generated corpus.
+# Usage: python benchmarks/bench_recipe_functions.py --recipes 2000 --json results.json
+#        python benchmarks/bench_recipe_functions.py --compare results.json   (after a change)
+
+
+def percentile(ordered, pct):
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def bench(fn, inputs, repeat):
+    # Best of `repeat` passes over the corpus, plus the per-call distribution of the fastest pass
+    best_total, best_calls = float("inf"), None
+    for _ in range(repeat):
+        calls = []
+        for item in inputs:
+            start = time.perf_counter()
+            fn(item)
+            calls.append(time.perf_counter() - start)
+        total = sum(calls)
+        if total < best_total:
+            best_total, best_calls = total, calls
+    best_calls.sort()
+    return {
+        "calls": len(inputs),
+        "total_ms": best_total * 1e3,
+        "mean_us": best_total / len(inputs) * 1e6,
+        "p50_us": percentile(best_calls, 50) * 1e6,
+        "p99_us": percentile(best_calls, 99) * 1e6,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmark the recipe helper functions")
+    parser.add_argument("--recipes", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--compare", help="results file from an earlier run to compare against")
+    args = parser.parse_args()
+
+    corpus = make_corpus(args.recipes, args.seed)
+    steps = [step["text"] for text in corpus for step in extract_steps_and_times(text)]
+    ingredient_lists = [extract_ingredients(text) for text in corpus]
+    cases = {
+        "extract_steps_and_times": (extract_steps_and_times, corpus),
+        "extract_ingredients": (extract_ingredients, corpus),
+        "get_placeholder_image": (get_placeholder_image, steps),
+        "generate_shopping_list": (generate_shopping_list, ingredient_lists),
+    }
+    baseline = {}
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    results = {}
+    print(f"{'function':<26}{'calls':>8}{'total':>12}{'mean':>12}{'p50':>12}{'p99':>12}{'vs baseline':>14}")
+    for name, (fn, inputs) in cases.items():
+        result = results[name] = bench(fn, inputs, args.repeat)
+        change = ""
+        if name in baseline:
+            change = f"{(result['mean_us'] / baseline[name]['mean_us'] - 1) * 100:+.1f}%"
+        print(f"{name:<26}{result['calls']:>8}{result['total_ms']:>10.1f}ms{result['mean_us']:>10.2f}us"
+              f"{result['p50_us']:>10.2f}us{result['p99_us']:>10.2f}us{change:>14}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+import os
+import sys
+import time
+import random
+import hashlib
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from recipe_store import RecipeStore
+from prompts import DIETARY_OPTIONS, SEASONS, REGIONS
+
+# Insert and search benchmark for the recipe history store.
+# Usage: python benchmarks/bench_recipe_store.py --recipes 1000000 --queries 500
+
+DISHES = ["soup", "stew", "curry", "salad", "pasta", "risotto", "tacos", "pie", "bread", "cake", "noodles", "pilaf", "tart", "roast"]
+
+
+def synthetic_record(rng, i, vocabulary):
+    ingredients = rng.sample(vocabulary, rng.randint(5, 12))
+    title = f"{ingredients[0].title()} {rng.choice(DISHES).title()} {i}"
+    recipe = f"# {title}\n\n## Ingredients\n" + "\n".join(f"- {item}" for item in ingredients)
+    return {
+        "hash": hashlib.sha1(recipe.encode("utf-8")).hexdigest(),
+        "title": title,
+        "mode": "By Dish Name",
+        "subject": title.lower(),
+        "ingredients": "\n".join(ingredients),
+        "dietary": rng.choice(DIETARY_OPTIONS) if rng.random() < 0.3 else "",
+        "allergens": "",
+        "season": rng.choice(SEASONS) if rng.random() < 0.5 else "",
+        "region": rng.choice(REGIONS) if rng.random() < 0.5 else "",
+        "recipe": recipe,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark RecipeStore bulk inserts and full-text search")
+    parser.add_argument("--recipes", type=int, default=200000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--batch", type=int, default=10000, help="records per add_many transaction")
+    parser.add_argument("--vocabulary", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    vocabulary = [f"ingredient{i}" for i in range(args.vocabulary)] + [rng.choice(DISHES) for _ in range(20)]
+    with tempfile.TemporaryDirectory() as directory:
+        store = RecipeStore(os.path.join(directory, "recipes.sqlite3"))
+        start = time.perf_counter()
+        for offset in range(0, args.recipes, args.batch):
+            store.add_many([synthetic_record(rng, i, vocabulary) for i in range(offset, min(args.recipes, offset + args.batch))])
+        store.optimize()
+        build_time = time.perf_counter() - start
+        print(f"stored {len(store)} recipes in {build_time:.1f}s ({args.recipes / build_time:.0f} recipes/s)")
+
+        # Mix of rare terms, very common terms and multi-term queries with tags
+        queries = []
+        for _ in range(args.queries):
+            kind = rng.random()
+            if kind < 0.4:
+                queries.append(rng.choice(vocabulary[:args.vocabulary]))
+            elif kind < 0.7:
+                queries.append(rng.choice(DISHES))
+            else:
+                queries.append(f"{rng.choice(DISHES)} {rng.choice(SEASONS)} {rng.choice(DIETARY_OPTIONS)}")
+
+        latencies = []
+        results = 0
+        for query in queries:
+            start = time.perf_counter()
+            results += len(store.search(query))
+            latencies.append(time.perf_counter() - start)
+        latencies.sort()
+        p50 = latencies[len(latencies) // 2] * 1e3
+        p99 = latencies[int(len(latencies) * 0.99)] * 1e3
+        print(f"{len(queries)} searches: p50 {p50:.2f} ms, p99 {p99:.2f} ms, {results / len(queries):.1f} results each")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+import os
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from similarity import IngredientIndex
+from prompts import DIETARY_OPTIONS, SEASONS, REGIONS
+
+# Lookup benchmark for the ingredient-set similarity index.
+# Usage: python benchmarks/bench_similarity.py --recipes 100000 --queries 2000
+
+
+def random_constraints(rng):
+    return ((rng.choice(DIETARY_OPTIONS),) if rng.random() < 0.3 else (), (), rng.choice([None] + SEASONS), rng.choice([None] + REGIONS))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark IngredientIndex add/query throughput")
+    parser.add_argument("--recipes", type=int, default=100000)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--vocabulary", type=int, default=400)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    vocabulary = [f"ingredient {i}" for i in range(args.vocabulary)]
+    index = IngredientIndex(max_entries=args.recipes)
+    stored = []
+
+    start = time.perf_counter()
+    for i in range(args.recipes):
+        ingredients = rng.sample(vocabulary, rng.randint(4, 12))
+        constraints = random_constraints(rng)
+        index.add(ingredients, i, constraints)
+        stored.append((ingredients, constraints))
+    build_time = time.perf_counter() - start
+    print(f"indexed {args.recipes} recipes in {build_time:.2f}s ({build_time / args.recipes * 1e6:.1f} us/add)")
+
+    # Half the queries are perturbed copies of stored sets (should hit), half are random (should miss)
+    queries = []
+    for _ in range(args.queries // 2):
+        ingredients, constraints = rng.choice(stored)
+        queries.append((ingredients + [rng.choice(vocabulary)], constraints))
+    for _ in range(args.queries - len(queries)):
+        queries.append((rng.sample(vocabulary, rng.randint(4, 12)), random_constraints(rng)))
+
+    latencies = []
+    hits = 0
+    for ingredients, constraints in queries:
+        start = time.perf_counter()
+        result = index.query(ingredients, constraints)
+        latencies.append(time.perf_counter() - start)
+        hits += result is not None
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2] * 1e6
+    p99 = latencies[int(len(latencies) * 0.99)] * 1e6
+    print(f"{len(queries)} queries: p50 {p50:.1f} us, p99 {p99:.1f} us, {hits} hits")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+import json
+import random
+import hashlib
+
+# Synthetic recipe responses in the layouts Gemini produces, shared by the micro-benchmarks and the mock server.
+
+DISHES = [
+    "Vegetable Curry", "Chocolate Cake", "Lemon Herb Chicken", "Spring Pea Risotto", "Beef Stew", "Pad Thai",
+    "Mushroom Stroganoff", "Shakshuka", "Chicken Tikka Masala", "Minestrone Soup", "Fish Tacos", "Banana Bread",
+]
+INGREDIENTS = [
+    "2 cups all-purpose flour", "1 tsp salt", "3 large eggs", "1 cup milk", "2 tbsp olive oil", "1 onion, finely chopped",
+    "3 cloves garlic, minced", "400 g chicken breast", "1 (14 oz) can diced tomatoes", "1/2 cup sugar", "200 ml coconut milk",
+    "1 1/2 cups basmati rice", "2 carrots, diced", "1 cup frozen peas", "250 g mushrooms, sliced", "2 tbsp soy sauce",
+    "1 tsp ground cumin", "1 lemon, juiced", "2 cups vegetable stock", "100 g butter", "Salt and pepper to taste",
+    "1 bunch fresh parsley", "2 potatoes, cubed", "1 red bell pepper, sliced", "1/4 cup grated parmesan",
+]
+ACTIONS = [
+    "Preheat the oven to 180°C", "Chop the onion and garlic", "Mix the flour and sugar", "Stir in the stock",
+    "Fry the chicken until golden", "Slice the peppers", "Bake until set", "Blend the sauce until smooth",
+    "Simmer gently", "Cook the rice", "Sauté the mushrooms", "Let it rest", "Season and serve", "Whisk the eggs",
+]
+DURATIONS = ["(2 minutes)", "(5 minutes)", "(10 minutes)", "(30 seconds)", "(1 hour)", "(15-20 minutes)", "(45 mins)", ""]
+
+
+def _steps(rng, count):
+    return [f"{rng.choice(ACTIONS)} {rng.choice(DURATIONS)}".strip() for _ in range(count)]
+
+
+def inline_recipe(rng, title, ingredients, steps):
+    lines = [f"Dish: {title}", f"Servings: {rng.randint(2, 6)}", "Ingredients: " + ", ".join(item.split(",")[0] for item in ingredients)]
+    lines += [f"Step {number}: {step}" for number, step in enumerate(steps, start=1)]
+    return "\n".join(lines) + "\n"
+
+
+def markdown_recipe(rng, title, ingredients, steps):
+    lines = [f"## {title}", "", f"Serves {rng.randint(2, 6)}", "", "**Ingredients:**", ""]
+    lines += [f"* {item}" for item in ingredients]
+    lines += ["", "**Instructions:**", ""]
+    lines += [f"**Step {number}:** {step}" for number, step in enumerate(steps, start=1)]
+    lines += ["", "**Tips:**", "* Leftovers keep for two days."]
+    return "\n".join(lines) + "\n"
+
+
+def numbered_recipe(rng, title, ingredients, steps):
+    lines = [f"# {title}", "", "Ingredients", ""]
+    lines += [f"- {item}" for item in ingredients]
+    lines += ["", "Directions", ""]
+    lines += [f"{number}. {step}" for number, step in enumerate(steps, start=1)]
+    return "\n".join(lines) + "\n"
+
+
+LAYOUTS = (inline_recipe, markdown_recipe, numbered_recipe)
+
+
+def make_recipe(rng, title=None, min_steps=4, max_steps=12):
+    title = title or rng.choice(DISHES)
+    ingredients = rng.sample(INGREDIENTS, rng.randint(5, 14))
+    return rng.choice(LAYOUTS)(rng, title, ingredients, _steps(rng, rng.randint(min_steps, max_steps)))
+
+
+def make_recipe_json(rng, title=None):
+    ingredients = rng.sample(INGREDIENTS, rng.randint(5, 14))
+    steps = [{"instruction": rng.choice(ACTIONS), "duration_seconds": rng.choice([30, 120, 300, 600, 1800])} for _ in range(rng.randint(4, 12))]
+    return json.dumps({"title": title or rng.choice(DISHES), "servings": rng.randint(2, 6), "ingredients": ingredients, "steps": steps})
+
+
+def make_suggestions(rng):
+    return "\n".join(f"**{number}. {dish}**\nA seasonal favourite.\nKey ingredients: peas, mint, lemon\n"
+                     for number, dish in enumerate(rng.sample(DISHES, 3), start=1))
+
+
+def make_corpus(count, seed=7):
+    rng = random.Random(seed)
+    corpus = [make_recipe(rng) for _ in range(count)]
+    # A few long responses, as produced when the model rambles
+    corpus += [make_recipe(rng, min_steps=60, max_steps=120) for _ in range(max(1, count // 50))]
+    return corpus
+
+
+def seeded_rng(text):
+    # Same prompt, same response: keeps mock output stable across runs
+    return random.Random(int(hashlib.sha1(text.encode("utf-8")).hexdigest()[:12], 16))
@@ -0,0 +1,152 @@
+import os
+import sys
+import time
+import random
+import asyncio
+import logging
+import tempfile
+import argparse
+import threading
+import warnings
+
+# Drives concurrent simulated sessions through the same generate path as the "Generate Recipe" page,
+# against the mock Gemini server, and reports throughput and latency percentiles. Runs offline.
+# Usage: python benchmarks/load_test.py --sessions 50 --requests 4 --unique 40 --error-rate 0.05
+#        python benchmarks/load_test.py --target 127.0.0.1:50051   (mock_gemini.py started separately)
+# Caching, single-flight and rate limiting are the app's own; tune them with the usual environment variables.
+os.environ.setdefault("GEMINI_API_KEY", "mock")
+os.environ.setdefault("RECIPE_CACHE_PATH", "")
+os.environ.setdefault("RECIPE_STORE_PATH", os.path.join(tempfile.mkdtemp(prefix="recipe-load-"), "recipes.sqlite3"))
+os.environ.setdefault("GEMINI_REQUESTS_PER_MINUTE", "600000")
+os.environ.setdefault("GEMINI_BURST", "1000")
+warnings.simplefilter("ignore", FutureWarning)
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import generator
+from generator import get_recipe, get_structured_recipe, stream_recipe, response_cache, inflight, upstream
+from event_loop import run, iterate
+from prompts import canonical_request, build_recipe_prompt
+from recipe_parser import RecipeParser, parse_recipe, format_recipe, generate_shopping_list
+from recipe_store import recipe_store, recipe_record
+from nutrition import recipe_nutrition
+from corpus import DISHES
+from mock_gemini import add_arguments, mock_from_args, connect
+
+MODIFIERS = ["", "vegan ", "quick ", "spicy ", "gluten-free ", "one-pot ", "smoky ", "creamy ", "roasted ", "summer "]
+
+
+def make_requests(unique, seed):
+    rng = random.Random(seed)
+    subjects = [f"{modifier}{dish}".strip() for modifier in MODIFIERS for dish in DISHES]
+    rng.shuffle(subjects)
+    subjects = subjects[:unique] if unique else subjects
+    return [canonical_request("By Dish Name", subject) for subject in subjects]
+
+
+def generate(request, mode):
+    # One "Generate Recipe" click: returns seconds to the first chunk (None when not streamed)
+    start = time.perf_counter()
+    first_chunk = None
+    if mode == "stream":
+        parser = RecipeParser()
+        chunks = []
+        for chunk in iterate(stream_recipe(build_recipe_prompt(request))):
+            if first_chunk is None:
+                first_chunk = time.perf_counter() - start
+            chunks.append(chunk)
+            parser.feed(chunk)
+        parser.close()
+        recipe, text = parser.recipe, "".join(chunks)
+    elif mode == "structured":
+        recipe = run(get_structured_recipe(build_recipe_prompt(request, structured=True), fallback_prompt=build_recipe_prompt(request)))
+        text = format_recipe(recipe)
+    else:
+        text = run(get_recipe(build_recipe_prompt(request)))
+        recipe = parse_recipe(text)
+    generate_shopping_list(recipe.ingredients)
+    recipe_nutrition(recipe.ingredients, recipe.servings)
+    recipe_store.add(recipe_record(request, text, recipe))
+    return first_chunk
+
+
+def session(requests, count, mode, think_time, rng, results):
+    for _ in range(count):
+        request = rng.choice(requests)
+        start = time.perf_counter()
+        try:
+            first_chunk = generate(request, mode)
+            results.append((time.perf_counter() - start, first_chunk, None))
+        except Exception as e:
+            results.append((time.perf_counter() - start, None, type(e).__name__))
+        if think_time:
+            time.sleep(rng.uniform(0, 2 * think_time))
+
+
+def percentile(ordered, pct):
+    if not ordered:
+        return float("nan")
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def report(results, elapsed, sessions):
+    totals = sorted(total for total, _, error in results if error is None)
+    first_chunks = sorted(first for _, first, error in results if error is None and first is not None)
+    errors = {}
+    for _, _, error in results:
+        if error is not None:
+            errors[error] = errors.get(error, 0) + 1
+    print(f"{sessions} sessions, {len(results)} requests in {elapsed:.2f} s: "
+          f"{len(totals) / elapsed:.1f} recipes/s, {len(results) - len(totals)} failed")
+    print(f"{'':<16}{'p50':>10}{'p95':>10}{'p99':>10}{'max':>10}")
+    for name, values in (("total", totals), ("first chunk", first_chunks)):
+        if values:
+            print(f"{name:<16}" + "".join(f"{percentile(values, pct):>9.3f}s" for pct in (50, 95, 99, 100)))
+    if errors:
+        print("errors: " + ", ".join(f"{name}={count}" for name, count in sorted(errors.items())))
+    for name, stats in (("cache", response_cache.stats), ("single-flight", inflight.stats), ("upstream", upstream.stats)):
+        print(f"{name}: " + " ".join(f"{key}={value}" for key, value in stats.items()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the recipe generate flow against a mock Gemini server")
+    parser.add_argument("--sessions", type=int, default=20, help="concurrent simulated sessions")
+    parser.add_argument("--requests", type=int, default=5, help="recipes generated by each session")
+    parser.add_argument("--unique", type=int, default=0, help="distinct dishes requested (0: all); fewer means more cache hits")
+    parser.add_argument("--mode", choices=("stream", "unary", "structured"), default="stream")
+    parser.add_argument("--think-time", type=float, default=0.0, help="mean seconds a session waits between requests")
+    parser.add_argument("--target", help="address of a running mock_gemini.py; otherwise one is started in-process")
+    add_arguments(parser)
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    mock = None
+    address = args.target
+    if address is None:
+        # The mock gets its own loop and thread so serving does not compete with the app's background loop
+        mock = mock_from_args(args)
+        mock_loop = asyncio.new_event_loop()
+        threading.Thread(target=mock_loop.run_forever, name="mock-gemini", daemon=True).start()
+        address = asyncio.run_coroutine_threadsafe(mock.start(), mock_loop).result()
+    generator.create_model = connect(address)
+
+    requests = make_requests(args.unique, args.seed)
+    results = []
+    threads = [
+        threading.Thread(target=session, args=(requests, args.requests, args.mode, args.think_time, random.Random(index), results))
+        for index in range(args.sessions)
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    report(results, time.perf_counter() - start, args.sessions)
+    if mock is not None:
+        print("mock: " + " ".join(f"{name}={value}" for name, value in mock.stats.items()))
+        asyncio.run_coroutine_threadsafe(mock.stop(), mock_loop).result()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+import os
+import sys
+import time
+import random
+import asyncio
+import argparse
+import warnings
+
+import grpc
+
+warnings.simplefilter("ignore", FutureWarning)
+import google.generativeai as genai
+from google.ai.generativelanguage_v1beta.types import GenerateContentRequest, GenerateContentResponse
+from google.ai.generativelanguage_v1beta.services.generative_service import GenerativeServiceAsyncClient
+from google.ai.generativelanguage_v1beta.services.generative_service.transports.grpc_asyncio import GenerativeServiceGrpcAsyncIOTransport
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from corpus import make_recipe, make_recipe_json, make_suggestions, seeded_rng
+
+# A local stand-in for the Gemini API, speaking the same gRPC service as the real endpoint so the
+# google-generativeai client, retries and streaming are all exercised without network access.
+# Usage: python benchmarks/mock_gemini.py --port 50051 --latency 0.8 --error-rate 0.05
+SERVICE = "google.ai.generativelanguage.v1beta.GenerativeService"
+ERROR_CODES = {
+    "unavailable": grpc.StatusCode.UNAVAILABLE,
+    "resource_exhausted": grpc.StatusCode.RESOURCE_EXHAUSTED,
+    "internal": grpc.StatusCode.INTERNAL,
+    "deadline_exceeded": grpc.StatusCode.DEADLINE_EXCEEDED,
+}
+
+
+class MockGemini:
+    def __init__(self, latency=0.5, jitter=0.2, first_token=0.3, chunk_size=80, chunk_delay=0.02,
+                 error_rate=0.0, stream_error_rate=0.0, error_code="resource_exhausted", seed=None):
+        # latency: full response time of a unary call; first_token: delay before the first streamed chunk;
+        # jitter: +/- fraction applied to both. error_rate fails calls up front, stream_error_rate mid-stream.
+        self.latency = latency
+        self.jitter = jitter
+        self.first_token = first_token
+        self.chunk_size = chunk_size
+        self.chunk_delay = chunk_delay
+        self.error_rate = error_rate
+        self.stream_error_rate = stream_error_rate
+        self.error_code = ERROR_CODES[error_code]
+        self.rng = random.Random(seed)
+        self.stats = {"requests": 0, "streams": 0, "errors": 0, "stream_errors": 0}
+        self._server = None
+
+    def _delay(self, seconds):
+        return max(0.0, seconds * (1 + self.rng.uniform(-self.jitter, self.jitter)))
+
+    def _text(self, request):
+        prompt = "\n".join(part.text for content in request.contents for part in content.parts)
+        rng = seeded_rng(prompt)
+        if request.generation_config.response_mime_type == "application/json":
+            return make_recipe_json(rng)
+        if "seasonal" in prompt.lower() and "suggest" in prompt.lower():
+            return make_suggestions(rng)
+        return make_recipe(rng)
+
+    def _response(self, text):
+        return GenerateContentResponse(
+            candidates=[{"content": {"role": "model", "parts": [{"text": text}]}, "finish_reason": "STOP", "index": 0}],
+            usage_metadata={"prompt_token_count": 64, "candidates_token_count": len(text) // 4},
+        )
+
+    async def _maybe_fail(self, context):
+        if self.rng.random() < self.error_rate:
+            self.stats["errors"] += 1
+            await asyncio.sleep(self._delay(0.05))
+            await context.abort(self.error_code, "mock upstream error")
+
+    async def generate_content(self, request, context):
+        self.stats["requests"] += 1
+        await self._maybe_fail(context)
+        await asyncio.sleep(self._delay(self.latency))
+        return self._response(self._text(request))
+
+    async def stream_generate_content(self, request, context):
+        self.stats["streams"] += 1
+        await self._maybe_fail(context)
+        text = self._text(request)
+        fail_at = len(text) // 2 if self.rng.random() < self.stream_error_rate else None
+        await asyncio.sleep(self._delay(self.first_token))
+        for start in range(0, len(text), self.chunk_size):
+            if fail_at is not None and start >= fail_at:
+                self.stats["stream_errors"] += 1
+                await context.abort(self.error_code, "mock upstream error mid-stream")
+            if start:
+                await asyncio.sleep(self._delay(self.chunk_delay))
+            yield self._response(text[start:start + self.chunk_size])
+
+    async def start(self, address="127.0.0.1:0"):
+        handlers = grpc.method_handlers_generic_handler(SERVICE, {
+            "GenerateContent": grpc.unary_unary_rpc_method_handler(
+                self.generate_content,
+                request_deserializer=GenerateContentRequest.deserialize,
+                response_serializer=GenerateContentResponse.serialize,
+            ),
+            "StreamGenerateContent": grpc.unary_stream_rpc_method_handler(
+                self.stream_generate_content,
+                request_deserializer=GenerateContentRequest.deserialize,
+                response_serializer=GenerateContentResponse.serialize,
+            ),
+        })
+        self._server = grpc.aio.server()
+        self._server.add_generic_rpc_handlers((handlers,))
+        port = self._server.add_insecure_port(address)
+        await self._server.start()
+        return f"{address.rsplit(':', 1)[0]}:{port}"
+
+    async def stop(self, grace=None):
+        if self._server is not None:
+            await self._server.stop(grace)
+            self._server = None
+
+
+def connect(address):
+    # Returns a create_model replacement for generator.py whose models talk to the mock at `address`.
+    # It must run on the event loop that will use the model, which get_model already guarantees.
+    def create_model(model_name, generation_config):
+        model = genai.GenerativeModel(model_name=model_name, generation_config=generation_config)
+        transport = GenerativeServiceGrpcAsyncIOTransport(channel=grpc.aio.insecure_channel(address))
+        model._async_client = GenerativeServiceAsyncClient(transport=transport)
+        return model
+    return create_model
+
+
+async def serve(mock, address):
+    bound = await mock.start(address)
+    print(f"mock Gemini listening on {bound}")
+    try:
+        while True:
+            await asyncio.sleep(10)
+            print(" ".join(f"{name}={value}" for name, value in mock.stats.items()), time.strftime("%H:%M:%S"))
+    finally:
+        await mock.stop()
+
+
+def add_arguments(parser):
+    parser.add_argument("--latency", type=float, default=0.5, help="seconds for a non-streamed response")
+    parser.add_argument("--first-token", type=float, default=0.3, help="seconds before the first streamed chunk")
+    parser.add_argument("--jitter", type=float, default=0.2, help="+/- fraction applied to every delay")
+    parser.add_argument("--chunk-size", type=int, default=80, help="characters per streamed chunk")
+    parser.add_argument("--chunk-delay", type=float, default=0.02, help="seconds between streamed chunks")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of calls failed before responding")
+    parser.add_argument("--stream-error-rate", type=float, default=0.0, help="fraction of streams failed halfway")
+    parser.add_argument("--error-code", choices=sorted(ERROR_CODES), default="resource_exhausted")
+    parser.add_argument("--seed", type=int, default=None)
+
+
+def mock_from_args(args):
+    return MockGemini(latency=args.latency, jitter=args.jitter, first_token=args.first_token, chunk_size=args.chunk_size,
+                      chunk_delay=args.chunk_delay, error_rate=args.error_rate, stream_error_rate=args.stream_error_rate,
+                      error_code=args.error_code, seed=args.seed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a mock Gemini API over gRPC")
+    parser.add_argument("--port", type=int, default=50051)
+    parser.add_argument("--host", default="127.0.0.1")
+    add_arguments(parser)
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(mock_from_args(args), f"{args.host}:{args.port}"))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
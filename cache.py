@@ -0,0 +1,218 @@
+import os
+import json
+import time
+import sqlite3
+import asyncio
+import hashlib
+import threading
+from collections import OrderedDict
+
+# Cache settings (override via environment)
+CACHE_PATH = os.getenv("RECIPE_CACHE_PATH", os.path.join(".cache", "responses.sqlite3"))
+CACHE_TTL = float(os.getenv("RECIPE_CACHE_TTL", 24 * 60 * 60))
+# Expired entries are kept this much longer so they can be served while the upstream is down
+STALE_TTL = float(os.getenv("RECIPE_CACHE_STALE_TTL", 7 * 24 * 60 * 60))
+MEMORY_MAX_ENTRIES = int(os.getenv("RECIPE_CACHE_MEMORY_ENTRIES", 256))
+DISK_MAX_ENTRIES = int(os.getenv("RECIPE_CACHE_DISK_ENTRIES", 10000))
+
+
+def make_cache_key(model_name, generation_config, prompt):
+    payload = json.dumps(
+        {"model": model_name, "config": generation_config or {}, "prompt": prompt},
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LRUCache:
+    def __init__(self, max_entries=MEMORY_MAX_ENTRIES, ttl=CACHE_TTL, stale_ttl=STALE_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, allow_stale=False):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            value, created = entry
+            age = time.time() - created
+            if self.ttl and age > self.ttl:
+                if age > self.ttl + self.stale_ttl:
+                    del self._data[key]
+                    return None
+                if not allow_stale:
+                    return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, created=None):
+        with self._lock:
+            self._data[key] = (value, created if created is not None else time.time())
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class DiskCache:
+    # SQLite in WAL mode so several Streamlit worker processes can share one file
+    def __init__(self, path=CACHE_PATH, max_entries=DISK_MAX_ENTRIES, ttl=CACHE_TTL, stale_ttl=STALE_TTL):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        # Trimming needs a full COUNT(*), so it runs every 1% of max_entries writes rather than on each one
+        self.evict_every = max(1, max_entries // 100)
+        self._writes = 0
+        self._lock = threading.Lock()
+        if path != ":memory:" and os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, created REAL NOT NULL, accessed REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)")
+
+    def get(self, key, allow_stale=False):
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT value, created FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            value, created = row
+            if self.ttl and now - created > self.ttl:
+                if now - created > self.ttl + self.stale_ttl:
+                    self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    return None
+                if not allow_stale:
+                    return None
+            self._conn.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+            return value, created
+
+    def set(self, key, value):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, created, accessed) VALUES (?, ?, ?, ?)",
+                (key, value, now, now),
+            )
+            self._writes += 1
+            if self._writes % self.evict_every == 0:
+                self._evict(now)
+
+    def _evict(self, now):
+        if self.ttl:
+            self._conn.execute("DELETE FROM responses WHERE created < ?", (now - self.ttl - self.stale_ttl,))
+        count = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        if count > self.max_entries:
+            self._conn.execute(
+                "DELETE FROM responses WHERE key IN "
+                "(SELECT key FROM responses ORDER BY accessed ASC LIMIT ?)",
+                (count - self.max_entries,),
+            )
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+
+def in_executor(fn, *args):
+    return asyncio.get_running_loop().run_in_executor(None, fn, *args)
+
+
+class ResponseCache:
+    # Two tiers: a per-process LRU in front of the shared on-disk store.
+    # The *_async methods are for the shared event loop: the LRU is checked on the loop, but SQLite
+    # (which can wait up to 30 s on another process's write lock) runs in the default executor.
+    def __init__(self, memory=None, disk=None):
+        self.memory = memory if memory is not None else LRUCache()
+        self.disk = disk
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0}
+        self._lock = threading.Lock()
+
+    def _count(self, name):
+        with self._lock:
+            self.stats[name] += 1
+
+    def _get_memory(self, key):
+        value = self.memory.get(key)
+        if value is not None:
+            self._count("memory_hits")
+        elif self.disk is None:
+            self._count("misses")
+        return value
+
+    def _from_disk(self, key, row):
+        if row is None:
+            self._count("misses")
+            return None
+        value, created = row
+        self.memory.set(key, value, created)
+        self._count("disk_hits")
+        return value
+
+    def get(self, key):
+        value = self._get_memory(key)
+        if value is None and self.disk is not None:
+            value = self._from_disk(key, self.disk.get(key))
+        return value
+
+    async def get_async(self, key):
+        value = self._get_memory(key)
+        if value is None and self.disk is not None:
+            value = self._from_disk(key, await in_executor(self.disk.get, key))
+        return value
+
+    def get_stale(self, key):
+        # Last known value even if past its TTL; used as a fallback when the upstream is unavailable
+        value = self.memory.get(key, allow_stale=True)
+        if value is None and self.disk is not None:
+            row = self.disk.get(key, allow_stale=True)
+            if row is not None:
+                value = row[0]
+        return value
+
+    async def get_stale_async(self, key):
+        value = self.memory.get(key, allow_stale=True)
+        if value is None and self.disk is not None:
+            row = await in_executor(self.disk.get, key, True)
+            if row is not None:
+                value = row[0]
+        return value
+
+    def set(self, key, value):
+        self.memory.set(key, value)
+        if self.disk is not None:
+            self.disk.set(key, value)
+
+    async def set_async(self, key, value):
+        self.memory.set(key, value)
+        if self.disk is not None:
+            await in_executor(self.disk.set, key, value)
+
+    def clear(self):
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+    def hit_rate(self):
+        hits = self.stats["memory_hits"] + self.stats["disk_hits"]
+        total = hits + self.stats["misses"]
+        return hits / total if total else 0.0
@@ -0,0 +1,87 @@
+import time
+import asyncio
+import queue
+import threading
+
+from metrics import metrics
+
+
+class BackgroundLoop:
+    # One long-lived event loop per process, shared by every Streamlit session.
+    # Async clients created on it (e.g. the Gemini gRPC channel) stay bound to it and are reused.
+    def __init__(self, name="recipe-event-loop"):
+        self.name = name
+        self._loop = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    @property
+    def loop(self):
+        with self._lock:
+            if self._loop is None or self._loop.is_closed():
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=self._loop.run_forever, name=self.name, daemon=True)
+                self._thread.start()
+            return self._loop
+
+    def submit(self, coro):
+        if metrics.enabled:
+            coro = self._timed(coro, time.perf_counter())
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    async def _timed(self, coro, submitted):
+        # How long work waits for the shared loop to pick it up
+        metrics.observe("loop_wait", time.perf_counter() - submitted)
+        return await coro
+
+    def run(self, coro, timeout=None):
+        future = self.submit(coro)
+        try:
+            return future.result(timeout)
+        except BaseException:
+            future.cancel()
+            raise
+
+    def iterate(self, agen):
+        # Drive an async generator on the loop and hand its items to the calling thread
+        items = queue.Queue()
+
+        async def pump():
+            try:
+                async for item in agen:
+                    items.put((True, item))
+                items.put((False, None))
+            except BaseException as e:
+                items.put((False, e))
+
+        future = self.submit(pump())
+        try:
+            while True:
+                ok, item = items.get()
+                if not ok:
+                    if item is not None:
+                        raise item
+                    return
+                yield item
+        finally:
+            future.cancel()
+
+    def stop(self):
+        with self._lock:
+            if self._loop is not None and not self._loop.is_closed():
+                self._loop.call_soon_threadsafe(self._loop.stop)
+                self._thread.join()
+                self._loop.close()
+            self._loop = None
+            self._thread = None
+
+
+background_loop = BackgroundLoop()
+
+
+def run(coro, timeout=None):
+    return background_loop.run(coro, timeout)
+
+
+def iterate(agen):
+    return background_loop.iterate(agen)
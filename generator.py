@@ -0,0 +1,233 @@
+import os
+import json
+import time
+import asyncio
+import threading
+from dotenv import load_dotenv
+import google.generativeai as genai
+from cache import ResponseCache, DiskCache, make_cache_key, CACHE_PATH
+from singleflight import SingleFlight, LeaderAbandoned
+from similarity import IngredientIndex
+from ratelimit import create_guard, CircuitOpenError
+from recipe_parser import RECIPE_SCHEMA, recipe_from_json, parse_recipe
+from metrics import metrics
+
+# Load environment variables
+load_dotenv()
+gemini_api_key = os.getenv("GEMINI_API_KEY")
+
+# Configure Gemini API
+genai.configure(api_key=gemini_api_key)
+
+MODEL_NAME = "models/gemini-1.5-pro-001"
+GENERATION_CONFIG = {
+    "max_output_tokens": 1200,
+    "temperature": 0.7,
+}
+
+# Structured output mode: the model returns JSON matching RECIPE_SCHEMA instead of free text
+STRUCTURED_GENERATION_CONFIG = {
+    **GENERATION_CONFIG,
+    "response_mime_type": "application/json",
+    "response_schema": RECIPE_SCHEMA,
+}
+
+# Shared response cache; set RECIPE_CACHE_PATH to an empty string to keep it in memory only
+response_cache = ResponseCache(disk=DiskCache(CACHE_PATH) if CACHE_PATH else None)
+
+# Identical prompts already being generated are awaited instead of sent upstream again
+inflight = SingleFlight()
+
+# Rate limiting, retries and circuit breaking for every Gemini call in this process
+upstream = create_guard()
+
+# Counters exported next to the latency histograms
+metrics.add_collector(lambda: {
+    **{("recipe_cache_total", "event", name): value for name, value in response_cache.stats.items()},
+    **{("recipe_singleflight_total", "event", name): value for name, value in inflight.stats.items()},
+    **{("recipe_upstream_total", "event", name): value for name, value in upstream.stats.items()},
+})
+
+# Concurrent full-recipe generations started by "Expand all", shared by every session on the background loop.
+# The semaphore is created on that loop at first use: on Python 3.8/3.9 creating it at import binds it to
+# the importing thread's loop, and Streamlit imports this module from a thread that has none.
+EXPAND_CONCURRENCY = int(os.getenv("RECIPE_EXPAND_CONCURRENCY", 6))
+expand_limit = None
+
+# Ingredient-set index used to reuse recipes for near-identical "By Ingredients" requests
+recipe_index = IngredientIndex(threshold=float(os.getenv("RECIPE_SIMILARITY_THRESHOLD", 0.8)))
+
+
+def create_model(model_name=MODEL_NAME, generation_config=GENERATION_CONFIG):
+    return genai.GenerativeModel(
+        model_name=model_name,
+        generation_config=generation_config
+    )
+
+
+# Models are shared by all sessions so their async client (and its connections) is reused
+_models = {}
+_models_lock = threading.Lock()
+
+
+def get_model(model_name=MODEL_NAME, generation_config=GENERATION_CONFIG):
+    key = (model_name, json.dumps(generation_config, sort_keys=True))
+    with _models_lock:
+        model = _models.get(key)
+        if model is None:
+            model = _models[key] = create_model(model_name, generation_config)
+        return model
+
+
+def timed_attempt(fn, started):
+    # Records when the attempt actually starts, after rate limiting and any retry backoff,
+    # so upstream latency is measured apart from queueing
+    async def attempt():
+        started[0] = time.perf_counter()
+        return await fn()
+    return attempt
+
+
+async def call_upstream(guard, fn):
+    if guard is None:
+        return await fn()
+    return await guard.call(fn)
+
+
+async def get_recipe(prompt, model_name=MODEL_NAME, generation_config=GENERATION_CONFIG, model=None, cache=response_cache, inflight=inflight, guard=upstream, cacheable=None):
+    # cacheable(text) -> bool keeps responses the caller can't use (e.g. malformed JSON) out of the cache
+    key = make_cache_key(model_name, generation_config, prompt)
+    if cache is not None:
+        cached = await cache.get_async(key)
+        if cached is not None:
+            return cached
+    if model is None:
+        model = get_model(model_name, generation_config)
+
+    async def generate():
+        started = [0.0]
+        try:
+            response = await call_upstream(guard, timed_attempt(lambda: model.generate_content_async(prompt), started))
+        except CircuitOpenError:
+            stale = await cache.get_stale_async(key) if cache is not None else None
+            if stale is None:
+                raise
+            return stale
+        text = response.text
+        metrics.observe("upstream_total", time.perf_counter() - started[0])
+        if cache is not None and (cacheable is None or cacheable(text)):
+            await cache.set_async(key, text)
+        return text
+
+    if inflight is None:
+        return await generate()
+    return await inflight.do(key, generate)
+
+
+async def stream_recipe(prompt, model_name=MODEL_NAME, generation_config=GENERATION_CONFIG, model=None, cache=response_cache, inflight=inflight, guard=upstream):
+    key = make_cache_key(model_name, generation_config, prompt)
+    if cache is not None:
+        cached = await cache.get_async(key)
+        if cached is not None:
+            yield cached
+            return
+
+    # Followers of an identical in-flight call receive its full text in one chunk
+    future = None
+    if inflight is not None:
+        while True:
+            pending = inflight.join(key)
+            if pending is None:
+                break
+            try:
+                yield await pending
+                return
+            except LeaderAbandoned:
+                continue
+        future = inflight.begin(key)
+
+    if model is None:
+        model = get_model(model_name, generation_config)
+    chunks = []
+    started = [0.0]
+    try:
+        try:
+            response = await call_upstream(guard, timed_attempt(lambda: model.generate_content_async(prompt, stream=True), started))
+        except CircuitOpenError:
+            stale = await cache.get_stale_async(key) if cache is not None else None
+            if stale is None:
+                raise
+            if future is not None:
+                inflight.finish(key, future, stale)
+            yield stale
+            return
+        try:
+            async for chunk in (response if guard is None else guard.iterate(response, started[0])):
+                if not chunks:
+                    metrics.observe("upstream_first_token", time.perf_counter() - started[0])
+                chunks.append(chunk.text)
+                yield chunk.text
+        except Exception:
+            if guard is not None:
+                guard.record_failure()
+            raise
+    except BaseException as e:
+        if future is not None:
+            inflight.finish(key, future, error=e)
+        raise
+    metrics.observe("upstream_total", time.perf_counter() - started[0])
+    text = "".join(chunks)
+    if cache is not None:
+        await cache.set_async(key, text)
+    if future is not None:
+        inflight.finish(key, future, text)
+
+
+def is_valid_recipe_json(text):
+    try:
+        recipe_from_json(text)
+    except ValueError:
+        return False
+    return True
+
+
+async def get_structured_recipe(prompt, fallback_prompt=None, model=None, cache=response_cache, inflight=inflight, guard=upstream):
+    # Returns a parsed Recipe. Invalid JSON is run through the text parser; if that finds nothing
+    # usable either, the request is repeated in text mode (with fallback_prompt when given).
+    # Only valid JSON is cached, so a bad payload is not replayed for every repeat of the prompt.
+    text = await get_recipe(prompt, generation_config=STRUCTURED_GENERATION_CONFIG, model=model, cache=cache, inflight=inflight, guard=guard,
+                            cacheable=is_valid_recipe_json)
+    try:
+        return recipe_from_json(text)
+    except ValueError:
+        pass
+    recipe = parse_recipe(text)
+    if recipe.steps or recipe.ingredients:
+        return recipe
+    text = await get_recipe(fallback_prompt or prompt, model=model, cache=cache, inflight=inflight, guard=guard)
+    return parse_recipe(text)
+
+
+async def expand_recipes(prompts, limit=None, **kwargs):
+    # Fans out one get_recipe call per prompt and yields (index, recipe, error) in completion order
+    global expand_limit
+    if limit is None:
+        if expand_limit is None:
+            expand_limit = asyncio.Semaphore(EXPAND_CONCURRENCY)
+        limit = expand_limit
+    async def generate(index, prompt):
+        waiting = time.perf_counter()
+        async with limit:
+            metrics.observe("queue_wait", time.perf_counter() - waiting)
+            try:
+                return index, await get_recipe(prompt, **kwargs), None
+            except Exception as e:
+                return index, None, e
+
+    tasks = [asyncio.ensure_future(generate(index, prompt)) for index, prompt in enumerate(prompts)]
+    try:
+        for task in asyncio.as_completed(tasks):
+            yield await task
+    finally:
+        for task in tasks:
+            task.cancel()
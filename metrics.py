@@ -0,0 +1,170 @@
+import os
+import json
+import time
+import bisect
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+# Per-stage latency histograms for the request path (override via environment):
+# RECIPE_METRICS=1 turns collection on; RECIPE_METRICS_PORT also serves /metrics (Prometheus text) and
+# /metrics.json; RECIPE_METRICS_LOG also appends every observation to a JSON lines file.
+METRICS_PORT = int(os.getenv("RECIPE_METRICS_PORT", 0))
+METRICS_LOG = os.getenv("RECIPE_METRICS_LOG", "")
+METRICS_ENABLED = os.getenv("RECIPE_METRICS", "").lower() in ("1", "true", "yes") or bool(METRICS_PORT or METRICS_LOG)
+
+# Seconds; wide enough for both sub-millisecond parsing and long model calls
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0)
+
+
+class Histogram:
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q):
+        # Upper bound of the bucket holding the q-th observation, as Prometheus' histogram_quantile would estimate
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return self.buckets[index] if index < len(self.buckets) else float("inf")
+        return float("inf")
+
+
+class _Timer:
+    __slots__ = ("metrics", "stage", "start")
+
+    def __init__(self, metrics, stage):
+        self.metrics = metrics
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.observe(self.stage, time.perf_counter() - self.start)
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class Metrics:
+    def __init__(self, enabled=METRICS_ENABLED, log_path=METRICS_LOG):
+        self.enabled = enabled
+        self.histograms = {}
+        self.collectors = []
+        self._lock = threading.Lock()
+        self._log = open(log_path, "a", encoding="utf-8", buffering=1) if enabled and log_path else None
+        self._server = None
+
+    def observe(self, stage, seconds):
+        if not self.enabled:
+            return
+        with self._lock:
+            histogram = self.histograms.get(stage)
+            if histogram is None:
+                histogram = self.histograms[stage] = Histogram()
+            histogram.observe(seconds)
+            if self._log is not None:
+                self._log.write(json.dumps({"ts": time.time(), "stage": stage, "seconds": round(seconds, 6)}) + "\n")
+
+    def timer(self, stage):
+        # with metrics.timer("parse"): ...
+        return _Timer(self, stage) if self.enabled else _NULL_TIMER
+
+    def add_collector(self, collect):
+        # collect() returns {(metric name, label name, label value): number} read at scrape time, e.g. cache counters
+        self.collectors.append(collect)
+
+    def snapshot(self):
+        with self._lock:
+            stages = {
+                stage: {
+                    "count": histogram.count,
+                    "sum": round(histogram.sum, 6),
+                    "p50": histogram.quantile(0.5),
+                    "p95": histogram.quantile(0.95),
+                    "p99": histogram.quantile(0.99),
+                }
+                for stage, histogram in sorted(self.histograms.items())
+            }
+        counters = {}
+        for collect in self.collectors:
+            for (name, label, value), number in collect().items():
+                counters.setdefault(name, {})[value] = number
+        return {"stages": stages, "counters": counters}
+
+    def render_prometheus(self):
+        lines = [
+            "# HELP recipe_stage_seconds Latency of each stage of the recipe request path.",
+            "# TYPE recipe_stage_seconds histogram",
+        ]
+        with self._lock:
+            for stage, histogram in sorted(self.histograms.items()):
+                cumulative = 0
+                for bound, count in zip(histogram.buckets + ("+Inf",), histogram.counts):
+                    cumulative += count
+                    lines.append(f'recipe_stage_seconds_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+                lines.append(f'recipe_stage_seconds_sum{{stage="{stage}"}} {histogram.sum:.6f}')
+                lines.append(f'recipe_stage_seconds_count{{stage="{stage}"}} {histogram.count}')
+        names = set()
+        for collect in self.collectors:
+            for (name, label, value), number in sorted(collect().items()):
+                if name not in names:
+                    names.add(name)
+                    lines.append(f"# TYPE {name} counter")
+                lines.append(f'{name}{{{label}="{value}"}} {number}')
+        return "\n".join(lines) + "\n"
+
+    def serve(self, port=METRICS_PORT, host="0.0.0.0"):
+        # Idempotent, so it can be called from a script Streamlit reruns on every interaction
+        with self._lock:
+            if not self.enabled or not port or self._server is not None:
+                return
+            metrics = self
+
+            class Handler(BaseHTTPRequestHandler):
+                def do_GET(self):
+                    if self.path == "/metrics":
+                        body, content_type = metrics.render_prometheus(), "text/plain; version=0.0.4"
+                    elif self.path == "/metrics.json":
+                        body, content_type = json.dumps(metrics.snapshot()), "application/json"
+                    else:
+                        self.send_error(404)
+                        return
+                    payload = body.encode("utf-8")
+                    self.send_response(200)
+                    self.send_header("Content-Type", content_type)
+                    self.send_header("Content-Length", str(len(payload)))
+                    self.end_headers()
+                    self.wfile.write(payload)
+
+                def log_message(self, *args):
+                    pass
+
+            self._server = ThreadingHTTPServer((host, port), Handler)
+            threading.Thread(target=self._server.serve_forever, name="recipe-metrics", daemon=True).start()
+
+
+metrics = Metrics()
@@ -0,0 +1,213 @@
+import os
+import re
+import csv
+from functools import lru_cache
+
+import numpy as np
+
+# Per-serving nutrition computed locally from the ingredient list instead of asking the model for it.
+# nutrients.csv holds values per 100 g, plus typical weights of a cup and of one piece for volume and count units.
+NUTRIENTS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "nutrients.csv")
+NUTRIENTS = ("calories", "protein", "carbohydrates", "fat", "fiber", "sugar", "sodium")
+NUTRIENT_LABELS = {
+    "calories": ("Calories", "kcal"),
+    "protein": ("Protein", "g"),
+    "carbohydrates": ("Carbohydrates", "g"),
+    "fat": ("Fat", "g"),
+    "fiber": ("Fiber", "g"),
+    "sugar": ("Sugar", "g"),
+    "sodium": ("Sodium", "mg"),
+}
+DEFAULT_SERVINGS = 4
+
+ML_PER_CUP = 236.6
+# Unit -> (kind, factor): mass units convert to grams, volume units to millilitres
+UNITS = {
+    "g": ("mass", 1.0), "gram": ("mass", 1.0), "grams": ("mass", 1.0), "gr": ("mass", 1.0),
+    "kg": ("mass", 1000.0), "kilogram": ("mass", 1000.0), "kilograms": ("mass", 1000.0),
+    "mg": ("mass", 0.001),
+    "oz": ("mass", 28.35), "ounce": ("mass", 28.35), "ounces": ("mass", 28.35),
+    "lb": ("mass", 453.6), "lbs": ("mass", 453.6), "pound": ("mass", 453.6), "pounds": ("mass", 453.6),
+    "stick": ("mass", 113.0), "sticks": ("mass", 113.0),
+    "ml": ("volume", 1.0), "milliliter": ("volume", 1.0), "milliliters": ("volume", 1.0), "millilitre": ("volume", 1.0), "millilitres": ("volume", 1.0),
+    "l": ("volume", 1000.0), "liter": ("volume", 1000.0), "liters": ("volume", 1000.0), "litre": ("volume", 1000.0), "litres": ("volume", 1000.0),
+    "cup": ("volume", ML_PER_CUP), "cups": ("volume", ML_PER_CUP), "c": ("volume", ML_PER_CUP),
+    "tbsp": ("volume", 14.79), "tbs": ("volume", 14.79), "tablespoon": ("volume", 14.79), "tablespoons": ("volume", 14.79),
+    "tsp": ("volume", 4.93), "teaspoon": ("volume", 4.93), "teaspoons": ("volume", 4.93),
+    "fl oz": ("volume", 29.57), "pint": ("volume", 473.2), "pints": ("volume", 473.2), "quart": ("volume", 946.4), "quarts": ("volume", 946.4),
+    "pinch": ("volume", 0.31), "pinches": ("volume", 0.31), "dash": ("volume", 0.62), "dashes": ("volume", 0.62),
+    "handful": ("mass", 30.0), "handfuls": ("mass", 30.0), "bunch": ("mass", 100.0), "bunches": ("mass", 100.0),
+    "can": ("mass", 400.0), "cans": ("mass", 400.0), "tin": ("mass", 400.0), "tins": ("mass", 400.0),
+    "clove": ("piece", 1.0), "cloves": ("piece", 1.0), "slice": ("piece", 1.0), "slices": ("piece", 1.0),
+    "piece": ("piece", 1.0), "pieces": ("piece", 1.0), "fillet": ("piece", 1.0), "fillets": ("piece", 1.0),
+    "head": ("piece", 1.0), "heads": ("piece", 1.0), "stalk": ("piece", 1.0), "stalks": ("piece", 1.0),
+}
+_FRACTIONS = {"½": " 1/2", "⅓": " 1/3", "⅔": " 2/3", "¼": " 1/4", "¾": " 3/4", "⅛": " 1/8", "⅕": " 1/5", "⅙": " 1/6"}
+_FRACTION_CHARS = re.compile("[" + "".join(_FRACTIONS) + "]")
+_NUMBER = r"\d+\s+\d+/\d+|\d+/\d+|\d+(?:\.\d+)?"
+_UNIT = "|".join(sorted((re.escape(unit) for unit in UNITS), key=len, reverse=True))
+_QUANTITY = re.compile(
+    rf"(?P<amount>{_NUMBER})(?:\s*(?:-|–|to)\s*(?P<upper>{_NUMBER}))?"
+    rf"(?:\s*\(\s*(?P<inner>{_NUMBER})\s*(?P<inner_unit>{_UNIT})\.?\s*\))?"
+    rf"\s*(?:(?P<unit>{_UNIT})\b\.?)?(?:\s+of\b)?",
+    re.IGNORECASE,
+)
+_LEADING = re.compile(r"^[\s\-*•·]+")
+_WORD = re.compile(r"\w+")
+
+
+def _load_table(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    names = [row["name"] for row in rows]
+    # Values per gram, so a recipe's totals are grams @ table
+    values = np.array([[float(row[nutrient]) for nutrient in NUTRIENTS] for row in rows], dtype=np.float64) / 100.0
+    cup_grams = np.array([float(row["grams_per_cup"] or "nan") for row in rows])
+    piece_grams = np.array([float(row["grams_per_piece"] or "nan") for row in rows])
+    aliases = {}
+    for index, row in enumerate(rows):
+        for alias in [row["name"]] + [alias for alias in row["aliases"].split(";") if alias]:
+            aliases[" ".join(_WORD.findall(alias.lower()))] = index
+    return names, values, cup_grams, piece_grams, aliases
+
+
+FOOD_NAMES, NUTRIENT_TABLE, CUP_GRAMS, PIECE_GRAMS, _ALIASES = _load_table(NUTRIENTS_PATH)
+# First word of each alias -> most words in an alias starting with it, so most words are ruled out with one lookup
+_ALIAS_STARTS = {}
+for _alias in _ALIASES:
+    _words = _alias.split()
+    _ALIAS_STARTS[_words[0]] = max(_ALIAS_STARTS.get(_words[0], 0), len(_words))
+
+
+def parse_number(text):
+    total = 0.0
+    for part in text.split():
+        if "/" in part:
+            numerator, denominator = part.split("/")
+            total += float(numerator) / float(denominator) if float(denominator) else 0.0
+        else:
+            total += float(part)
+    return total
+
+
+def parse_quantity(line):
+    # "1 1/2 cups flour, sifted" -> (1.5, "cups", "flour, sifted"); (None, None, line) when no amount is given
+    text = _LEADING.sub("", _FRACTION_CHARS.sub(lambda m: _FRACTIONS[m.group()], line)).strip()
+    match = _QUANTITY.match(text)
+    if match is None:
+        # Name first, amount later: "Flour: 2 cups", "Chicken breast - 500g"
+        match = _QUANTITY.search(text)
+        if match is None or not (match.group("unit") or match.group("inner_unit")):
+            return None, None, text
+    amount = parse_number(match.group("amount"))
+    if match.group("upper"):
+        amount = (amount + parse_number(match.group("upper"))) / 2
+    unit = match.group("unit")
+    if match.group("inner"):
+        # "1 (14 oz) can tomatoes": the weight in parentheses is per item
+        amount *= parse_number(match.group("inner"))
+        unit = match.group("inner_unit")
+    name = (text[:match.start()] + " " + text[match.end():]).strip(" :-–,")
+    return amount, unit.lower() if unit else None, name
+
+
+def _lookup(words):
+    phrase = " ".join(words)
+    food = _ALIASES.get(phrase)
+    if food is None and phrase.endswith("s"):
+        # Plurals: "tomatoes" -> "tomato", "carrots" -> "carrot"
+        food = _ALIASES.get(phrase[:-2]) if phrase.endswith("es") else None
+        if food is None:
+            food = _ALIASES.get(phrase[:-1])
+    return food
+
+
+def match_food(name):
+    # Best table row for an ingredient name: the longest alias mentioned, the later one on ties ("egg noodles").
+    # Word n-grams are looked up in a dict, which stays fast as the table grows
+    words = _WORD.findall(name.lower())
+    best, best_length = -1, 0
+    for start, word in enumerate(words):
+        longest = _ALIAS_STARTS.get(word)
+        if longest is None:
+            if not word.endswith("s") or (word[:-1] not in _ALIASES and word[:-2] not in _ALIASES):
+                continue
+            longest = 1
+        for end in range(min(len(words), start + longest), start, -1):
+            food = _lookup(words[start:end])
+            if food is not None:
+                length = sum(len(word) for word in words[start:end]) + end - start - 1
+                if length >= best_length:
+                    best, best_length = food, length
+                break
+    return best
+
+
+@lru_cache(maxsize=65536)
+def parse_ingredient(line):
+    # Returns (table row, grams); row is -1 when the food or its amount can't be determined.
+    # Lines without an amount ("salt to taste") count as known and weigh nothing.
+    amount, unit, name = parse_quantity(line)
+    food = match_food(name)
+    if food < 0:
+        return -1, 0.0
+    if amount is None:
+        return food, 0.0
+    kind, factor = UNITS.get(unit, ("piece", 1.0))
+    if kind == "mass":
+        grams = amount * factor
+    elif kind == "volume":
+        cup = CUP_GRAMS[food]
+        grams = amount * factor * (cup / ML_PER_CUP if cup == cup else 1.0)
+    else:
+        grams = amount * factor * PIECE_GRAMS[food]
+    if grams != grams:
+        return -1, 0.0
+    return food, float(grams)
+
+
+def parse_ingredient_lists(ingredient_lists):
+    # Flattens a batch into parallel arrays: table row and grams per ingredient line, and line count per recipe
+    lengths = np.fromiter((len(lines) for lines in ingredient_lists), dtype=np.intp, count=len(ingredient_lists))
+    parsed = [parse_ingredient(line) for lines in ingredient_lists for line in lines]
+    foods = np.fromiter((food for food, _ in parsed), dtype=np.intp, count=len(parsed))
+    grams = np.fromiter((weight for _, weight in parsed), dtype=np.float64, count=len(parsed))
+    return foods, grams, lengths
+
+
+def aggregate_nutrition(foods, grams, lengths, servings=None):
+    # Per-recipe totals as one weighted sum per nutrient over every ingredient line of the batch.
+    # Returns (per-serving values, one row per recipe and one column per NUTRIENTS entry;
+    #          fraction of each recipe's ingredient lines that could be matched).
+    count = len(lengths)
+    owners = np.repeat(np.arange(count), lengths)
+    known = foods >= 0
+    contributions = NUTRIENT_TABLE[foods[known]] * grams[known, None]
+    totals = np.empty((count, len(NUTRIENTS)))
+    for column in range(len(NUTRIENTS)):
+        totals[:, column] = np.bincount(owners[known], weights=contributions[:, column], minlength=count)
+
+    if servings is None:
+        servings = np.full(count, DEFAULT_SERVINGS, dtype=np.float64)
+    else:
+        servings = np.array([value or DEFAULT_SERVINGS for value in servings], dtype=np.float64)
+    coverage = np.bincount(owners, weights=known, minlength=count) / np.maximum(lengths, 1)
+    return totals / servings[:, None], coverage
+
+
+def nutrition_per_serving(ingredient_lists, servings=None):
+    return aggregate_nutrition(*parse_ingredient_lists(ingredient_lists), servings)
+
+
+def format_nutrition(values):
+    facts = {}
+    for nutrient, value in zip(NUTRIENTS, values):
+        label, unit = NUTRIENT_LABELS[nutrient]
+        facts[label] = f"{value:.0f} {unit}" if unit in ("kcal", "mg") or value >= 10 else f"{value:.1f} {unit}"
+    return facts
+
+
+def recipe_nutrition(ingredients, servings=None):
+    # Formatted per-serving facts for one recipe, in the same name -> amount form as Recipe.nutrition
+    values, coverage = nutrition_per_serving([ingredients], [servings])
+    return format_nutrition(values[0]), float(coverage[0])
@@ -0,0 +1,93 @@
+import sys
+import time
+import asyncio
+import argparse
+from itertools import combinations
+
+from prompts import DIETARY_OPTIONS, SEASONS, REGIONS, build_suggestion_prompt
+from generator import get_recipe
+from suggestions import suggestion_store, suggestion_key
+from event_loop import run
+
+# Warms the Seasonal/Regional Suggestions store.
+# Usage: python precompute.py --combos single --concurrency 4
+#        python precompute.py --popular 50 --every 3600   (run as a worker, refreshing the busiest slice hourly)
+# Only missing entries and entries older than --max-age are generated, so reruns are incremental.
+
+
+def dietary_combinations(level):
+    combos = [()]
+    if level in ("single", "pairs"):
+        combos += [(option,) for option in DIETARY_OPTIONS]
+    if level == "pairs":
+        combos += list(combinations(DIETARY_OPTIONS, 2))
+    return combos
+
+
+def matrix_keys(seasons, regions, level):
+    return [suggestion_key(season, region, dietary) for season in seasons for region in regions for dietary in dietary_combinations(level)]
+
+
+def key_prompt(key):
+    season, region, dietary, allergens = key
+    return build_suggestion_prompt(season, region, dietary.split("|") if dietary else (), allergens.replace("|", ", "))
+
+
+async def refresh(store, keys, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+    failures = 0
+
+    async def worker(key):
+        nonlocal failures
+        async with semaphore:
+            try:
+                # Bypass the response cache so aged entries are actually regenerated
+                text = await get_recipe(key_prompt(key), cache=None)
+            except Exception as e:
+                failures += 1
+                print(f"{' / '.join(part for part in key if part)}: {e}", file=sys.stderr)
+                return
+            store.put(key, text)
+
+    await asyncio.gather(*(worker(key) for key in keys))
+    return failures
+
+
+def run_once(store, args):
+    if args.popular:
+        keys = [tuple(key) for key in store.popular_keys(args.popular)]
+    else:
+        keys = matrix_keys(args.seasons, args.regions, args.combos)
+    fresh = store.fresh_keys(args.max_age)
+    stale = [key for key in keys if key not in fresh]
+    print(f"{len(keys)} entries selected, {len(stale)} missing or older than {args.max_age:.0f}s")
+    start = time.perf_counter()
+    # The shared background loop keeps the model client usable across --every passes
+    failures = run(refresh(store, stale, args.concurrency))
+    print(f"refreshed {len(stale) - failures} entries in {time.perf_counter() - start:.1f}s, {failures} failed")
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Precompute Seasonal/Regional recipe suggestions")
+    parser.add_argument("--seasons", nargs="+", default=SEASONS, choices=SEASONS)
+    parser.add_argument("--regions", nargs="+", default=REGIONS, choices=REGIONS)
+    parser.add_argument("--combos", default="single", choices=["none", "single", "pairs"], help="dietary preference combinations to cover")
+    parser.add_argument("--popular", type=int, default=0, help="only refresh the N most requested entries already in the store")
+    parser.add_argument("--max-age", type=float, default=None, help="seconds before an entry is regenerated (default SUGGESTIONS_MAX_AGE)")
+    parser.add_argument("-c", "--concurrency", type=int, default=4)
+    parser.add_argument("--every", type=float, default=0, help="keep running, refreshing every N seconds")
+    args = parser.parse_args(argv)
+
+    store = suggestion_store
+    if args.max_age is None:
+        args.max_age = store.max_age
+    while True:
+        failures = run_once(store, args)
+        if not args.every:
+            return 1 if failures else 0
+        time.sleep(args.every)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,86 @@
+import re
+from collections import namedtuple
+
+DIETARY_OPTIONS = ["Vegan", "Vegetarian", "Gluten-Free", "Dairy-Free", "Keto", "Low-Carb"]
+SEASONS = ["Spring", "Summer", "Autumn", "Winter"]
+REGIONS = ["Italian", "Mexican", "Indian", "Japanese", "Mediterranean", "American", "Pakistani", "Thai", "Chinese", "French", "Brazilian"]
+
+RECIPE_FORMAT_INSTRUCTIONS = " Include dish name, the number of servings (e.g., 'Servings: 4'), a clearly labeled ingredients list with quantities (e.g., 'Ingredients: 2 cups flour, 1 tsp salt'), and clear, sequential step-by-step cooking instructions with estimated time for each step (e.g., 'Step 1: Preheat oven to 350°F (2 minutes)')."
+STRUCTURED_FORMAT_INSTRUCTIONS = " Return the recipe as JSON with the dish name as title, the number of servings, the ingredients list with quantities (e.g., '2 cups flour'), and clear, sequential cooking steps, each with its estimated duration in seconds."
+SUGGESTION_FORMAT_INSTRUCTIONS = " Number the recipes and start each one with its dish name on its own line (e.g., '1. Spring Pea Risotto'), followed by a brief description and a short list of key seasonal ingredients."
+
+# Normalized form of everything that shapes a prompt; equal requests produce byte-identical prompts
+RecipeRequest = namedtuple("RecipeRequest", ["mode", "subject", "dietary", "allergens", "season", "region"])
+
+_WHITESPACE = re.compile(r"\s+")
+_STRIP_CHARS = " \t\n.;:!?\"'"
+
+
+def normalize_term(term):
+    return _WHITESPACE.sub(" ", term).strip(_STRIP_CHARS).lower()
+
+
+def normalize_list(text):
+    # "Sugar,flour , eggs" -> ("eggs", "flour", "sugar")
+    if not text:
+        return ()
+    terms = {normalize_term(term) for term in re.split(r"[,\n]", text)}
+    terms.discard("")
+    return tuple(sorted(terms))
+
+
+def normalize_dietary(dietary_options):
+    selected = {normalize_term(option) for option in dietary_options or ()}
+    return tuple(option for option in DIETARY_OPTIONS if option.lower() in selected)
+
+
+def normalize_choice(value):
+    return None if not value or value == "None" else value
+
+
+def canonical_request(mode, user_input, dietary_options=(), allergen_exclusions="", season=None, region=None):
+    if mode == "By Dish Name":
+        subject = normalize_term(user_input)
+    else:
+        subject = normalize_list(user_input)
+    return RecipeRequest(
+        mode=mode,
+        subject=subject,
+        dietary=normalize_dietary(dietary_options),
+        allergens=normalize_list(allergen_exclusions),
+        season=normalize_choice(season),
+        region=normalize_choice(region),
+    )
+
+
+def request_constraints(request):
+    return (request.dietary, request.allergens, request.season, request.region)
+
+
+def build_recipe_prompt(request, structured=False):
+    if request.mode == "By Dish Name":
+        prompt = f"Provide a detailed recipe for {request.subject}."
+    else:
+        prompt = f"Create a detailed recipe using the following ingredients: {', '.join(request.subject)}."
+
+    # Add dietary, allergen, seasonal, regional, and step-by-step constraints to the prompt
+    if request.dietary:
+        prompt += f" The recipe must adhere to the following dietary preferences: {', '.join(request.dietary)}."
+    if request.allergens:
+        prompt += f" Exclude the following allergens: {', '.join(request.allergens)}."
+    if request.season:
+        prompt += f" Use ingredients that are in season during {request.season}."
+    if request.region:
+        prompt += f" The recipe should reflect the cuisine of {request.region}."
+    return prompt + (STRUCTURED_FORMAT_INSTRUCTIONS if structured else RECIPE_FORMAT_INSTRUCTIONS)
+
+
+def build_suggestion_prompt(season, region, dietary_options=(), allergen_exclusions=""):
+    dietary = normalize_dietary(dietary_options)
+    allergens = normalize_list(allergen_exclusions)
+    prompt = f"Suggest 3 recipes that use ingredients in season during {season} and reflect the cuisine of {region}."
+    if dietary:
+        prompt += f" The recipes must adhere to the following dietary preferences: {', '.join(dietary)}."
+    if allergens:
+        prompt += f" Exclude the following allergens: {', '.join(allergens)}."
+    return prompt + SUGGESTION_FORMAT_INSTRUCTIONS
@@ -0,0 +1,222 @@
+import os
+import time
+import random
+import sqlite3
+import asyncio
+import threading
+
+from metrics import metrics
+
+# Upstream protection settings (override via environment)
+REQUESTS_PER_MINUTE = float(os.getenv("GEMINI_REQUESTS_PER_MINUTE", 60))
+BURST = int(os.getenv("GEMINI_BURST", 5))
+RATE_LIMIT_PATH = os.getenv("GEMINI_RATE_LIMIT_PATH", "")
+MAX_RETRIES = int(os.getenv("GEMINI_MAX_RETRIES", 4))
+CALL_TIMEOUT = float(os.getenv("GEMINI_CALL_TIMEOUT", 90))
+BREAKER_THRESHOLD = int(os.getenv("GEMINI_BREAKER_THRESHOLD", 5))
+BREAKER_RESET = float(os.getenv("GEMINI_BREAKER_RESET", 30))
+
+# HTTP status codes (google.api_core exceptions expose them as .code) worth retrying
+RETRYABLE_STATUS = {408, 429, 500, 502, 503, 504}
+
+
+class CircuitOpenError(Exception):
+    def __init__(self, retry_after):
+        super().__init__(f"The recipe service is temporarily unavailable; please try again in {retry_after:.0f} seconds.")
+        self.retry_after = retry_after
+
+
+def is_retryable(error):
+    if isinstance(error, (asyncio.TimeoutError, ConnectionError)):
+        return True
+    return getattr(error, "code", None) in RETRYABLE_STATUS
+
+
+class TokenBucket:
+    # In-process bucket shared by every session on the background loop
+    def __init__(self, rate_per_minute=REQUESTS_PER_MINUTE, capacity=BURST):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _take(self):
+        # Returns 0 when a token was taken, otherwise the seconds until one is available
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0.0
+            return (1 - self.tokens) / self.rate
+
+    async def acquire(self):
+        while True:
+            wait = self._take()
+            if not wait:
+                return
+            await asyncio.sleep(wait)
+
+
+class SQLiteTokenBucket(TokenBucket):
+    # Same bucket stored in SQLite so all worker processes on a host share one quota
+    def __init__(self, path, rate_per_minute=REQUESTS_PER_MINUTE, capacity=BURST, name="gemini"):
+        super().__init__(rate_per_minute, capacity)
+        self.name = name
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS buckets (name TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)")
+        self._conn.execute("INSERT OR IGNORE INTO buckets VALUES (?, ?, ?)", (name, float(capacity), time.time()))
+
+    def _take(self):
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                tokens, updated = self._conn.execute("SELECT tokens, updated FROM buckets WHERE name = ?", (self.name,)).fetchone()
+                now = time.time()
+                tokens = min(self.capacity, tokens + max(0.0, now - updated) * self.rate)
+                wait = 0.0
+                if tokens >= 1:
+                    tokens -= 1
+                else:
+                    wait = (1 - tokens) / self.rate
+                self._conn.execute("UPDATE buckets SET tokens = ?, updated = ? WHERE name = ?", (tokens, now, self.name))
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            return wait
+
+    async def acquire(self):
+        while True:
+            wait = await asyncio.get_running_loop().run_in_executor(None, self._take)
+            if not wait:
+                return
+            await asyncio.sleep(wait)
+
+
+class CircuitBreaker:
+    # Opens after `threshold` consecutive failures; after `reset_timeout` one trial call is let through
+    def __init__(self, threshold=BREAKER_THRESHOLD, reset_timeout=BREAKER_RESET):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self.trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def check(self):
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return
+            if state == "half-open" and not self.trial_running:
+                self.trial_running = True
+                return
+            retry_after = max(1.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+            raise CircuitOpenError(retry_after)
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self.trial_running = False
+
+    def release_trial(self):
+        # The trial call was cancelled without an outcome; let the next caller try instead
+        with self._lock:
+            self.trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self.trial_running = False
+            if self.opened_at is not None or self.failures >= self.threshold:
+                self.opened_at = time.monotonic()
+
+
+class UpstreamGuard:
+    # Rate limit, per-attempt deadline, jittered exponential backoff and circuit breaking for one upstream
+    def __init__(self, limiter=None, breaker=None, max_retries=MAX_RETRIES, timeout=CALL_TIMEOUT, base_delay=1.0, max_delay=30.0):
+        self.limiter = limiter
+        self.breaker = breaker
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.stats = {"calls": 0, "retries": 0, "failures": 0, "rejected": 0}
+
+    async def call(self, fn):
+        attempt = 0
+        while True:
+            if self.breaker is not None:
+                try:
+                    self.breaker.check()
+                except CircuitOpenError:
+                    self.stats["rejected"] += 1
+                    raise
+            if self.limiter is not None:
+                waiting = time.perf_counter()
+                await self.limiter.acquire()
+                metrics.observe("queue_wait", time.perf_counter() - waiting)
+            self.stats["calls"] += 1
+            try:
+                result = await asyncio.wait_for(fn(), self.timeout) if self.timeout else await fn()
+            except asyncio.CancelledError:
+                if self.breaker is not None:
+                    self.breaker.release_trial()
+                raise
+            except Exception as e:
+                if self.breaker is not None:
+                    # Client errors (bad request, invalid key) mean the upstream itself is answering
+                    if is_retryable(e):
+                        self.breaker.record_failure()
+                    else:
+                        self.breaker.record_success()
+                if not is_retryable(e) or attempt >= self.max_retries:
+                    self.stats["failures"] += 1
+                    raise
+                attempt += 1
+                self.stats["retries"] += 1
+                # Full jitter keeps many sessions from retrying in lockstep
+                await asyncio.sleep(random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt)))
+                continue
+            if self.breaker is not None:
+                self.breaker.record_success()
+            return result
+
+    async def iterate(self, response, started):
+        # The per-attempt deadline, counted from `started` (time.perf_counter()), applied to a whole stream.
+        # call() only covers opening it, so a stream stalling after the first chunk would otherwise hang.
+        iterator = response.__aiter__()
+        while True:
+            try:
+                if self.timeout:
+                    chunk = await asyncio.wait_for(iterator.__anext__(), max(0.0, started + self.timeout - time.perf_counter()))
+                else:
+                    chunk = await iterator.__anext__()
+            except StopAsyncIteration:
+                return
+            yield chunk
+
+    def record_failure(self):
+        # For errors raised after call() returned, e.g. in the middle of a stream
+        if self.breaker is not None:
+            self.breaker.record_failure()
+
+
+def create_guard():
+    limiter = SQLiteTokenBucket(RATE_LIMIT_PATH) if RATE_LIMIT_PATH else TokenBucket()
+    return UpstreamGuard(limiter=limiter, breaker=CircuitBreaker())
@@ -0,0 +1,393 @@
+import re
+import json
+
+from metrics import metrics
+from nutrition import parse_number
+
+# Precompiled, line-anchored patterns; every line of a response is examined exactly once
+_EMPHASIS = re.compile(r"\*\*|__")
+_BULLET = re.compile(r"^(?:[#>*•\-]+\s*)+")
+_HEADER = re.compile(
+    r"^(ingredients|nutrition(?:al)?(?:\s+(?:information|info|facts|values))?|instructions|directions|method|preparation|steps)"
+    r"\b(?:[^:]{0,40}:\s*(.*)|\s*)$",
+    re.IGNORECASE,
+)
+_OTHER_HEADER = re.compile(r"^[A-Za-z][\w ,&'/()-]{0,60}:$")
+_STEP = re.compile(r"^step\s*(\d+)\s*[:.)\-–]?\s*(.*)$", re.IGNORECASE)
+_NUMBERED = re.compile(r"^(\d+)[.)]\s+(.*)$")
+_SERVINGS = re.compile(r"^(?:serves|servings?|yields?|makes)\b\s*:?\s*(\d+)", re.IGNORECASE)
+_SUGGESTION = re.compile(r"^(?:recipe\s*)?(\d+)\s*[.):]\s*(.+)$", re.IGNORECASE)
+_DISH_PREFIX = re.compile(r"^(?:dish(?:\s+name)?|name)\s*:\s*", re.IGNORECASE)
+_NAME_END = re.compile(r"\s*(?::|\s[-–—]\s)")
+_TITLE_PREFIX = re.compile(r"^(?:dish(?:\s+name)?|recipe(?:\s+name)?|title)\s*:\s*", re.IGNORECASE)
+_PAREN = re.compile(r"\(([^()]*)\)")
+# One amount and unit, e.g. "1 1/2 hours" or "15-20 minutes" (a range counts as its lower bound)
+# Same amounts as nutrition.parse_number reads, written with one leading \d+ so scanning text stays fast
+_DURATION_NUMBER = r"\d+(?:\.\d+)?(?:\s+\d+/\d+|/\d+)?"
+_DURATION_PART = rf"(?P<amount>{_DURATION_NUMBER})\s*(?:(?:-|–|to)\s*{_DURATION_NUMBER}\s*)?(?P<unit>hours?|hrs?|minutes?|mins?|seconds?|secs?)\b"
+_DURATION = re.compile(_DURATION_PART, re.IGNORECASE)
+# Further parts of a compound duration, e.g. the "30 minutes" of "1 hour 30 minutes"
+_DURATION_NEXT = re.compile(rf"\s*(?:,\s*|and\s+)?{_DURATION_PART}", re.IGNORECASE)
+_NUTRIENT = re.compile(r"^([A-Za-z][A-Za-z ()/-]{0,40}?)\s*[:–-]\s*(.+)$")
+_ITEM_SPLIT = re.compile(r",\s*")
+_BULLET_CHARS = "#>*•-"
+_HEADER_INITIALS = "IiNnDdMmPpSs"
+_SERVINGS_INITIALS = "SsYyMm"
+
+_UNIT_SECONDS = {"h": 3600, "m": 60, "s": 1}
+# Longest step duration accepted from structured output (a week covers curing and fermenting)
+MAX_STEP_SECONDS = 7 * 24 * 3600
+
+# Section identifiers
+TITLE, INGREDIENTS, NUTRITION, STEPS, OTHER = "title", "ingredients", "nutrition", "steps", "other"
+
+
+def get_placeholder_image(step_text):
+    step_text = step_text.lower()
+    if "preheat" in step_text or "oven" in step_text:
+        return "https://images.unsplash.com/photo-1600585154340-be6161a56a0c"
+    elif "mix" in step_text or "stir" in step_text or "blend" in step_text:
+        return "https://images.unsplash.com/photo-1600585154526-990dced4db0d"
+    elif "chop" in step_text or "cut" in step_text or "slice" in step_text:
+        return "https://images.unsplash.com/photo-1586201375761-83865001e31c"
+    elif "cook" in step_text or "fry" in step_text or "sauté" in step_text:
+        return "https://images.unsplash.com/photo-1565299624946-b28f40a0ae38"
+    elif "bake" in step_text:
+        return "https://images.unsplash.com/photo-1576618148400-f54bed99fcfd"
+    else:
+        return "https://images.unsplash.com/photo-1546069901-ba9599a7e63c"
+
+
+def parse_duration(text):
+    # Prefer a time given in parentheses, e.g. "(2 minutes)", then any duration in the text
+    for candidate in _PAREN.findall(text):
+        match = _DURATION.search(candidate)
+        if match:
+            break
+    else:
+        match = _DURATION.search(text)
+    if not match:
+        return 0
+    value, last_unit = 0.0, None
+    while match:
+        unit = _UNIT_SECONDS[match.group("unit")[0].lower()]
+        if last_unit is not None and unit >= last_unit:
+            break
+        amount = match.group("amount")
+        value += (parse_number(amount) if "/" in amount else float(amount)) * unit
+        last_unit = unit
+        match = _DURATION_NEXT.match(match.string, match.end())
+    return int(value) if value.is_integer() else value
+
+
+class Step:
+    __slots__ = ("number", "text", "seconds", "image_url")
+
+    def __init__(self, number, text, seconds=0, image_url=None):
+        self.number = number
+        self.text = text
+        self.seconds = seconds
+        self.image_url = image_url if image_url is not None else get_placeholder_image(text)
+
+    @property
+    def minutes(self):
+        return self.seconds / 60 if self.seconds % 60 else self.seconds // 60
+
+    def as_dict(self):
+        return {"text": self.text, "time_minutes": self.minutes, "image_url": self.image_url}
+
+    def __repr__(self):
+        return f"Step({self.number!r}, {self.text!r}, seconds={self.seconds!r})"
+
+
+class Recipe:
+    __slots__ = ("title", "ingredients", "steps", "nutrition", "servings")
+
+    def __init__(self, title=None, ingredients=None, steps=None, nutrition=None, servings=None):
+        self.title = title
+        self.ingredients = ingredients if ingredients is not None else []
+        self.steps = steps if steps is not None else []
+        self.nutrition = nutrition if nutrition is not None else {}
+        self.servings = servings
+
+    @property
+    def total_seconds(self):
+        return sum(step.seconds for step in self.steps)
+
+    def __repr__(self):
+        return f"Recipe(title={self.title!r}, ingredients={len(self.ingredients)}, steps={len(self.steps)})"
+
+
+class RecipeParser:
+    # Incremental single-pass parser: feed() text as it arrives, close() when the response is complete.
+    # A step is reported once the next line starts, since models often wrap a step over several lines.
+    def __init__(self):
+        self.recipe = Recipe()
+        self.section = TITLE
+        self.ingredients_done = False
+        self._pending = []
+        self._step_number = None
+        self._step_lines = []
+
+    def feed(self, chunk):
+        # Partial lines are kept as a list of pieces so a long unterminated line is not recopied per chunk
+        if "\n" not in chunk:
+            self._pending.append(chunk)
+            return []
+        self._pending.append(chunk)
+        lines = "".join(self._pending).split("\n")
+        self._pending = [lines.pop()]
+        completed = []
+        for line in lines:
+            step = self._parse_line(line)
+            if step is not None:
+                completed.append(step)
+        return completed
+
+    def close(self):
+        completed = []
+        tail = "".join(self._pending)
+        self._pending = []
+        if tail:
+            step = self._parse_line(tail)
+            if step is not None:
+                completed.append(step)
+        step = self._finish_step()
+        if step is not None:
+            completed.append(step)
+        self.ingredients_done = True
+        return completed
+
+    def _enter(self, section):
+        if self.section == INGREDIENTS and section != INGREDIENTS:
+            self.ingredients_done = True
+        self.section = section
+
+    def _finish_step(self):
+        if self._step_number is None:
+            return None
+        text = f"Step {self._step_number}: " + " ".join(self._step_lines)
+        step = Step(self._step_number, text, parse_duration(text))
+        self.recipe.steps.append(step)
+        self._step_number = None
+        self._step_lines = []
+        return step
+
+    def _parse_line(self, raw):
+        line = raw.strip()
+        if not line:
+            return None
+        is_bullet = line[0] in _BULLET_CHARS
+        if "**" in line or "__" in line:
+            line = _EMPHASIS.sub("", line).strip()
+        if line and line[0] in _BULLET_CHARS:
+            line = _BULLET.sub("", line)
+        if not line:
+            return None
+
+        first = line[0]
+        match = None
+        if first in "Ss":
+            match = _STEP.match(line)
+        elif self.section == STEPS and first.isdigit():
+            match = _NUMBERED.match(line)
+        if match:
+            completed = self._finish_step()
+            self._enter(STEPS)
+            self._step_number = int(match.group(1))
+            if match.group(2):
+                self._step_lines.append(match.group(2))
+            return completed
+
+        if first in _SERVINGS_INITIALS and self.recipe.servings is None and self.section != STEPS:
+            match = _SERVINGS.match(line)
+            if match:
+                self.recipe.servings = int(match.group(1)) or None
+                return None
+
+        match = _HEADER.match(line) if first in _HEADER_INITIALS else None
+        if match:
+            completed = self._finish_step()
+            name = match.group(1).lower()
+            if name == "ingredients":
+                self._enter(INGREDIENTS)
+            elif name.startswith("nutrition"):
+                self._enter(NUTRITION)
+            else:
+                self._enter(STEPS)
+            if match.group(2):
+                if self.section == STEPS:
+                    # "Instructions: Step 1: ..." on a single line
+                    return self._parse_line(match.group(2)) or completed
+                self._add_content(match.group(2), inline=True)
+            return completed
+
+        if _OTHER_HEADER.match(line) and self.section != INGREDIENTS:
+            # Unknown headings ("Tips:", "Equipment:") end the current section; sub-headings
+            # inside the ingredients list ("For the sauce:") are skipped instead
+            completed = self._finish_step()
+            self._enter(OTHER)
+            return completed
+
+        if self.section == STEPS and self._step_number is not None:
+            self._step_lines.append(line)
+        else:
+            self._add_content(line, inline=not is_bullet)
+        return None
+
+    def _add_content(self, line, inline):
+        recipe = self.recipe
+        if self.section == TITLE:
+            if recipe.title is None:
+                recipe.title = _TITLE_PREFIX.sub("", line).strip() or None
+        elif self.section == INGREDIENTS:
+            if line.endswith(":"):
+                return
+            # Inline lists ("Ingredients: 2 cups flour, 1 tsp salt") are comma-separated;
+            # bullet items are kept whole so "1 onion, chopped" stays one item
+            items = _ITEM_SPLIT.split(line) if inline else (line,)
+            for item in items:
+                item = item.strip()
+                if item:
+                    recipe.ingredients.append(item)
+        elif self.section == NUTRITION:
+            for item in (_ITEM_SPLIT.split(line) if inline else (line,)):
+                match = _NUTRIENT.match(item.strip())
+                if match:
+                    recipe.nutrition[match.group(1).strip()] = match.group(2).strip()
+                elif item.strip():
+                    recipe.nutrition.setdefault("summary", item.strip())
+
+
+def parse_recipe(recipe_text):
+    with metrics.timer("parse"):
+        parser = RecipeParser()
+        parser.feed(recipe_text)
+        parser.close()
+    return parser.recipe
+
+
+# Response schema for structured (JSON) output mode, in the OpenAPI subset Gemini accepts
+RECIPE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "title": {"type": "string"},
+        "ingredients": {"type": "array", "items": {"type": "string"}},
+        "servings": {"type": "integer"},
+        "steps": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {"instruction": {"type": "string"}, "duration_seconds": {"type": "integer"}},
+                "required": ["instruction"],
+            },
+        },
+    },
+    "required": ["title", "ingredients", "steps"],
+}
+
+
+def _require(condition, message):
+    if not condition:
+        raise ValueError(f"Invalid recipe JSON: {message}")
+
+
+def recipe_from_json(payload):
+    # Decode and validate a structured response; raises ValueError if it does not match RECIPE_SCHEMA
+    try:
+        data = json.loads(payload)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Invalid recipe JSON: {e}") from e
+    _require(isinstance(data, dict), "expected an object")
+    title = data.get("title")
+    ingredients = data.get("ingredients")
+    steps = data.get("steps")
+    nutrition = data.get("nutrition", [])
+    servings = data.get("servings")
+    _require(isinstance(title, str) and title.strip(), "title must be a non-empty string")
+    _require(isinstance(ingredients, list) and all(isinstance(item, str) for item in ingredients), "ingredients must be a list of strings")
+    _require(isinstance(steps, list) and steps, "steps must be a non-empty list")
+    _require(isinstance(nutrition, list), "nutrition must be a list")
+    _require(servings is None or (isinstance(servings, int) and not isinstance(servings, bool) and servings >= 0), "servings must be a non-negative integer")
+
+    recipe = Recipe(title=title.strip(), ingredients=[item.strip() for item in ingredients if item.strip()], servings=servings or None)
+    for number, step in enumerate(steps, start=1):
+        _require(isinstance(step, dict) and isinstance(step.get("instruction"), str), f"step {number} needs an instruction")
+        seconds = step.get("duration_seconds", 0)
+        # The chained comparison also rejects inf ("1e400" decodes to it) and NaN
+        _require(isinstance(seconds, (int, float)) and not isinstance(seconds, bool) and 0 <= seconds <= MAX_STEP_SECONDS, f"step {number} has an invalid duration")
+        recipe.steps.append(Step(number, f"Step {number}: {step['instruction'].strip()}", seconds))
+    for item in nutrition:
+        _require(isinstance(item, dict) and isinstance(item.get("name"), str) and isinstance(item.get("amount"), str), "nutrition items need a name and amount")
+        recipe.nutrition[item["name"]] = item["amount"]
+    return recipe
+
+
+def format_duration(seconds):
+    if seconds >= 3600 and seconds % 3600 == 0:
+        hours = seconds // 3600
+        return f"{hours} hour{'s' if hours != 1 else ''}"
+    if seconds >= 60 and seconds % 60 == 0:
+        minutes = seconds // 60
+        return f"{minutes} minute{'s' if minutes != 1 else ''}"
+    return f"{seconds} seconds"
+
+
+def format_recipe(recipe):
+    # Markdown rendering of a structured Recipe, in the same layout the text prompt asks for
+    lines = [f"## {recipe.title}", ""]
+    if recipe.servings:
+        lines += [f"Servings: {recipe.servings}", ""]
+    lines.append("**Ingredients:**")
+    lines += [f"- {item}" for item in recipe.ingredients]
+    if recipe.nutrition:
+        lines += ["", "**Nutritional Information (per serving):**"]
+        lines += [f"- {name}: {amount}" for name, amount in recipe.nutrition.items()]
+    lines += ["", "**Instructions:**", ""]
+    for step in recipe.steps:
+        lines.append(f"{step.text} ({format_duration(step.seconds)})" if step.seconds else step.text)
+        lines.append("")
+    return "\n".join(lines)
+
+
+def extract_steps_and_times(recipe_text):
+    return [step.as_dict() for step in parse_recipe(recipe_text).steps]
+
+
+def extract_ingredients(recipe_text):
+    return parse_recipe(recipe_text).ingredients
+
+
+def extract_suggested_dishes(suggestions_text, limit=3):
+    # Dish names from a suggestions response: "1. Spring Pea Risotto", "**Recipe 2: Lamb Tagine** - A slow...",
+    # or "Dish Name: ..." lines when the recipes are not numbered
+    # Emphasized or heading lines win over plain ones, and plain ones only count at the outermost
+    # indentation, so a numbered ingredient list can't replace a dish
+    headed, numbered, named = {}, {}, []
+    for raw in suggestions_text.split("\n"):
+        indent = len(raw) - len(raw.lstrip())
+        raw = raw.strip()
+        line = _BULLET.sub("", _EMPHASIS.sub("", raw)).strip()
+        match = _SUGGESTION.match(line)
+        if match:
+            name = _NAME_END.split(_DISH_PREFIX.sub("", match.group(2)), 1)[0].strip(" .*")
+            numbered.setdefault(indent, {}).setdefault(int(match.group(1)), name)
+            # "1. **Spring Pea Risotto** - ..." counts as emphasized as well as "**1. Spring Pea Risotto**"
+            if raw.startswith("#") or _EMPHASIS.search(raw):
+                headed.setdefault(int(match.group(1)), name)
+        elif _DISH_PREFIX.match(line):
+            named.append(_NAME_END.split(_DISH_PREFIX.sub("", line), 1)[0].strip(" .*"))
+    numbered = headed if len(headed) > 1 else numbered[min(numbered)] if numbered else {}
+    dishes = [numbered[number] for number in sorted(numbered)] if len(numbered) > 1 else named
+    unique = []
+    for dish in dishes:
+        if dish and dish.lower() not in (existing.lower() for existing in unique):
+            unique.append(dish)
+    return unique[:limit]
+
+
+def generate_shopping_list(ingredients):
+    shopping_list = "Shopping List\n\n"
+    for item in ingredients:
+        shopping_list += f"- {item}\n"
+    return shopping_list
@@ -0,0 +1,130 @@
+import os
+import re
+import time
+import sqlite3
+import hashlib
+import threading
+
+RECIPE_STORE_PATH = os.getenv("RECIPE_STORE_PATH", os.path.join(".cache", "recipes.sqlite3"))
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+
+def search_expression(query):
+    # User text becomes an AND of quoted prefix terms, so FTS5 operators and punctuation can't break the query
+    return " ".join(f'"{word}"*' for word in _WORD.findall(query.lower()))
+
+
+def request_subject(request):
+    # By Ingredients requests carry their subject as a tuple of terms
+    return request.subject if isinstance(request.subject, str) else ", ".join(request.subject)
+
+
+def recipe_record(request, recipe, parsed):
+    subject = request_subject(request)
+    return {
+        "hash": hashlib.sha1(recipe.encode("utf-8")).hexdigest(),
+        "title": parsed.title or subject,
+        "mode": request.mode,
+        "subject": subject,
+        "ingredients": "\n".join(parsed.ingredients),
+        "dietary": ", ".join(request.dietary),
+        "allergens": ", ".join(request.allergens),
+        "season": request.season or "",
+        "region": request.region or "",
+        "recipe": recipe,
+    }
+
+
+class RecipeStore:
+    # Every generated recipe, with an FTS5 index over its title, ingredients and tags
+    def __init__(self, path=RECIPE_STORE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        if path != ":memory:" and os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS recipes (
+                id INTEGER PRIMARY KEY, hash TEXT NOT NULL UNIQUE, title TEXT NOT NULL, mode TEXT NOT NULL,
+                subject TEXT NOT NULL, ingredients TEXT NOT NULL, dietary TEXT NOT NULL, allergens TEXT NOT NULL,
+                season TEXT NOT NULL, region TEXT NOT NULL, recipe TEXT NOT NULL, created REAL NOT NULL
+            );
+            CREATE VIRTUAL TABLE IF NOT EXISTS recipes_fts USING fts5(
+                title, ingredients, dietary, season, region,
+                content='recipes', content_rowid='id', tokenize='porter unicode61 remove_diacritics 2'
+            );
+            CREATE TRIGGER IF NOT EXISTS recipes_ai AFTER INSERT ON recipes BEGIN
+                INSERT INTO recipes_fts (rowid, title, ingredients, dietary, season, region)
+                VALUES (new.id, new.title, new.ingredients, new.dietary, new.season, new.region);
+            END;
+            CREATE TRIGGER IF NOT EXISTS recipes_ad AFTER DELETE ON recipes BEGIN
+                INSERT INTO recipes_fts (recipes_fts, rowid, title, ingredients, dietary, season, region)
+                VALUES ('delete', old.id, old.title, old.ingredients, old.dietary, old.season, old.region);
+            END;
+            """
+        )
+
+    def add(self, record):
+        return self.add_many([record])
+
+    def add_many(self, records):
+        # One transaction per batch; recipes already stored (same text) are skipped
+        now = time.time()
+        rows = [
+            (r["hash"], r["title"], r["mode"], r["subject"], r["ingredients"], r["dietary"], r["allergens"],
+             r["season"], r["region"], r["recipe"], r.get("created", now))
+            for r in records
+        ]
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                added = self._conn.executemany(
+                    "INSERT OR IGNORE INTO recipes (hash, title, mode, subject, ingredients, dietary, allergens, "
+                    "season, region, recipe, created) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    rows,
+                ).rowcount
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return added
+
+    def search(self, query, limit=20):
+        # Newest matches first: FTS5 walks its index in rowid order and stops at `limit`,
+        # which stays fast for common terms where ranking every match would not
+        expression = search_expression(query)
+        with self._lock:
+            if not expression:
+                rows = self._conn.execute(
+                    "SELECT id, title, dietary, season, region, created FROM recipes ORDER BY id DESC LIMIT ?", (limit,)
+                ).fetchall()
+            else:
+                rows = self._conn.execute(
+                    "SELECT r.id, r.title, r.dietary, r.season, r.region, r.created FROM recipes_fts "
+                    "JOIN recipes r ON r.id = recipes_fts.rowid WHERE recipes_fts MATCH ? "
+                    "ORDER BY recipes_fts.rowid DESC LIMIT ?",
+                    (expression, limit),
+                ).fetchall()
+        keys = ("id", "title", "dietary", "season", "region", "created")
+        return [dict(zip(keys, row)) for row in rows]
+
+    def get(self, recipe_id):
+        with self._lock:
+            row = self._conn.execute("SELECT recipe FROM recipes WHERE id = ?", (recipe_id,)).fetchone()
+        return row[0] if row else None
+
+    def optimize(self):
+        # Merges FTS5 index segments; worth running after large imports
+        with self._lock:
+            self._conn.execute("INSERT INTO recipes_fts (recipes_fts) VALUES ('optimize')")
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM recipes").fetchone()[0]
+
+
+recipe_store = RecipeStore()
@@ -0,0 +1,98 @@
+import os
+import zlib
+import threading
+from collections import OrderedDict
+import numpy as np
+
+# MinHash parameters: 64 permutations split into 16 bands of 4 rows
+NUM_PERM = 64
+BANDS = 16
+_PRIME = np.uint64(4294967311)  # smallest prime above 2**32
+# Entries kept before the least recently matched are evicted (override via environment)
+MAX_ENTRIES = int(os.getenv("RECIPE_SIMILARITY_MAX_ENTRIES", 2000))
+
+
+def jaccard(a, b):
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+class MinHasher:
+    def __init__(self, num_perm=NUM_PERM, seed=1):
+        rng = np.random.default_rng(seed)
+        # Coefficients below 2**31 keep a * h + b inside uint64 for 32-bit token hashes
+        self.a = rng.integers(1, 2 ** 31, size=num_perm, dtype=np.uint64)
+        self.b = rng.integers(0, 2 ** 31, size=num_perm, dtype=np.uint64)
+
+    def signature(self, tokens):
+        hashes = np.fromiter((zlib.crc32(token.encode("utf-8")) for token in tokens), dtype=np.uint64)
+        if hashes.size == 0:
+            return np.zeros(self.a.size, dtype=np.uint64)
+        return ((np.outer(self.a, hashes) + self.b[:, None]) % _PRIME).min(axis=1)
+
+
+class IngredientIndex:
+    # In-memory LSH index over ingredient sets. Entries only match requests with identical
+    # constraints (diet, allergens, season, region); candidates are confirmed with exact Jaccard.
+    # Holds at most max_entries recipes, evicting the least recently added or matched.
+    def __init__(self, threshold=0.8, num_perm=NUM_PERM, bands=BANDS, max_entries=MAX_ENTRIES):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.max_entries = max_entries
+        self.hasher = MinHasher(num_perm)
+        self._buckets = {}
+        # entry id -> (ingredient set, value, band keys), oldest first
+        self._entries = OrderedDict()
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _band_keys(self, signature, constraints):
+        rows = self.rows
+        return [(constraints, band, signature[band * rows:(band + 1) * rows].tobytes()) for band in range(self.bands)]
+
+    def _evict(self):
+        while len(self._entries) > self.max_entries:
+            entry_id, (_, _, keys) = self._entries.popitem(last=False)
+            for key in keys:
+                bucket = self._buckets[key]
+                bucket.discard(entry_id)
+                if not bucket:
+                    del self._buckets[key]
+
+    def add(self, ingredients, value, constraints=()):
+        ingredients = frozenset(ingredients)
+        keys = self._band_keys(self.hasher.signature(ingredients), constraints)
+        with self._lock:
+            entry_id = self._next_id
+            self._next_id += 1
+            self._entries[entry_id] = (ingredients, value, keys)
+            for key in keys:
+                self._buckets.setdefault(key, set()).add(entry_id)
+            self._evict()
+        return entry_id
+
+    def query(self, ingredients, constraints=(), threshold=None):
+        # Returns (value, similarity) for the closest stored set at or above the threshold, else None
+        threshold = self.threshold if threshold is None else threshold
+        ingredients = frozenset(ingredients)
+        keys = self._band_keys(self.hasher.signature(ingredients), constraints)
+        with self._lock:
+            candidates = set()
+            for key in keys:
+                candidates.update(self._buckets.get(key, ()))
+            best_id, best_score = None, threshold
+            for entry_id in candidates:
+                score = jaccard(ingredients, self._entries[entry_id][0])
+                if score >= best_score:
+                    best_id, best_score = entry_id, score
+            if best_id is None:
+                return None
+            self._entries.move_to_end(best_id)
+            return self._entries[best_id][1], best_score
@@ -0,0 +1,64 @@
+import asyncio
+
+
+class LeaderAbandoned(Exception):
+    # Raised to followers when the leading call was cancelled before producing a result
+    pass
+
+
+class SingleFlight:
+    # Coalesces concurrent calls for the same key into one upstream call.
+    # All calls must run on the same event loop (see event_loop.py).
+    def __init__(self):
+        self._calls = {}
+        self.stats = {"leaders": 0, "coalesced": 0, "errors": 0}
+
+    def __len__(self):
+        return len(self._calls)
+
+    def join(self, key):
+        future = self._calls.get(key)
+        if future is None:
+            return None
+        self.stats["coalesced"] += 1
+        return asyncio.shield(future)
+
+    def begin(self, key):
+        future = asyncio.get_running_loop().create_future()
+        self._calls[key] = future
+        self.stats["leaders"] += 1
+        return future
+
+    def finish(self, key, future, result=None, error=None):
+        if self._calls.get(key) is future:
+            del self._calls[key]
+        if future.done():
+            return
+        if error is None:
+            future.set_result(result)
+            return
+        if isinstance(error, (asyncio.CancelledError, GeneratorExit)):
+            error = LeaderAbandoned(key)
+        else:
+            self.stats["errors"] += 1
+        future.set_exception(error)
+        # Mark the exception as retrieved so a call without followers does not log a warning
+        future.exception()
+
+    async def do(self, key, fn):
+        while True:
+            pending = self.join(key)
+            if pending is None:
+                break
+            try:
+                return await pending
+            except LeaderAbandoned:
+                continue
+        future = self.begin(key)
+        try:
+            result = await fn()
+        except BaseException as e:
+            self.finish(key, future, error=e)
+            raise
+        self.finish(key, future, result)
+        return result
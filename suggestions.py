@@ -0,0 +1,76 @@
+import os
+import time
+import sqlite3
+import threading
+
+from prompts import normalize_dietary, normalize_list
+
+SUGGESTIONS_PATH = os.getenv("SUGGESTIONS_PATH", os.path.join(".cache", "suggestions.sqlite3"))
+SUGGESTIONS_MAX_AGE = float(os.getenv("SUGGESTIONS_MAX_AGE", 7 * 24 * 60 * 60))
+
+
+def suggestion_key(season, region, dietary_options=(), allergen_exclusions=""):
+    return (season, region, "|".join(normalize_dietary(dietary_options)), "|".join(normalize_list(allergen_exclusions)))
+
+
+class SuggestionStore:
+    # Precomputed Seasonal/Regional suggestions, one row per (season, region, dietary, allergens)
+    def __init__(self, path=SUGGESTIONS_PATH, max_age=SUGGESTIONS_MAX_AGE):
+        self.path = path
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        if path != ":memory:" and os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS suggestions ("
+            "season TEXT NOT NULL, region TEXT NOT NULL, dietary TEXT NOT NULL, allergens TEXT NOT NULL, "
+            "text TEXT NOT NULL, created REAL NOT NULL, hits INTEGER NOT NULL DEFAULT 0, "
+            "PRIMARY KEY (season, region, dietary, allergens)) WITHOUT ROWID"
+        )
+
+    def get(self, key, max_age=None):
+        max_age = self.max_age if max_age is None else max_age
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT text, created FROM suggestions WHERE season = ? AND region = ? AND dietary = ? AND allergens = ?", key
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                "UPDATE suggestions SET hits = hits + 1 WHERE season = ? AND region = ? AND dietary = ? AND allergens = ?", key
+            )
+        text, created = row
+        if max_age and time.time() - created > max_age:
+            return None
+        return text
+
+    def put(self, key, text):
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO suggestions (season, region, dietary, allergens, text, created) VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (season, region, dietary, allergens) DO UPDATE SET text = excluded.text, created = excluded.created",
+                (*key, text, time.time()),
+            )
+
+    def fresh_keys(self, max_age=None):
+        max_age = self.max_age if max_age is None else max_age
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT season, region, dietary, allergens FROM suggestions WHERE created >= ?", (time.time() - max_age,)
+            ).fetchall()
+        return set(rows)
+
+    def popular_keys(self, limit):
+        with self._lock:
+            return self._conn.execute(
+                "SELECT season, region, dietary, allergens FROM suggestions ORDER BY hits DESC LIMIT ?", (limit,)
+            ).fetchall()
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM suggestions").fetchone()[0]
+
+
+suggestion_store = SuggestionStore()
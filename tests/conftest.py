@@ -0,0 +1,11 @@
+import os
+import sys
+
+# Offline settings, applied before generator.py reads them at import
+os.environ["GEMINI_API_KEY"] = "test"
+os.environ["RECIPE_CACHE_PATH"] = ""
+os.environ["RECIPE_STORE_PATH"] = ":memory:"
+os.environ["GEMINI_REQUESTS_PER_MINUTE"] = "600000"
+os.environ["GEMINI_BURST"] = "1000"
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,40 @@
+import asyncio
+
+
+class Chunk:
+    def __init__(self, text):
+        self.text = text
+
+
+class Response:
+    def __init__(self, text, chunk_size=16, delay=0.0):
+        self.text = text
+        self.chunk_size = chunk_size
+        self.delay = delay
+
+    async def __aiter__(self):
+        for start in range(0, len(self.text), self.chunk_size):
+            await asyncio.sleep(self.delay)
+            yield Chunk(self.text[start:start + self.chunk_size])
+
+
+class StubModel:
+    # Stands in for genai.GenerativeModel: returns the given responses in turn (the last one repeats).
+    # An exception instance in responses is raised instead; delay holds each call open that long.
+    def __init__(self, *responses, delay=0.0, chunk_delay=0.0):
+        self.responses = list(responses) or ["Dish: Pancakes\nStep 1: Mix (2 minutes)\n"]
+        self.delay = delay
+        self.chunk_delay = chunk_delay
+        self.prompts = []
+
+    @property
+    def calls(self):
+        return len(self.prompts)
+
+    async def generate_content_async(self, prompt, stream=False, **kwargs):
+        self.prompts.append(prompt)
+        response = self.responses[min(len(self.prompts), len(self.responses)) - 1]
+        await asyncio.sleep(self.delay)
+        if isinstance(response, Exception):
+            raise response
+        return Response(response, delay=self.chunk_delay)
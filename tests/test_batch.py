@@ -0,0 +1,16 @@
+import pytest
+
+from batch import row_request
+from prompts import build_recipe_prompt
+
+
+def test_ingredient_separators_give_the_same_request():
+    rows = [{"ingredients": "eggs;flour"}, {"ingredients": "eggs, flour"}, {"ingredients": "flour | eggs"}, {"ingredients": ["eggs", "flour"]}]
+    requests = [row_request(row) for row in rows]
+    assert all(request == requests[0] for request in requests)
+    assert "following ingredients: eggs, flour." in build_recipe_prompt(requests[0])
+
+
+def test_row_without_input_is_rejected():
+    with pytest.raises(ValueError):
+        row_request({"mode": "ingredients", "ingredients": " ; "})
@@ -0,0 +1,147 @@
+import time
+import asyncio
+
+import pytest
+
+import cache
+from cache import LRUCache, DiskCache, ResponseCache, make_cache_key
+from generator import get_recipe
+from ratelimit import CircuitOpenError
+from stubs import StubModel
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr(cache.time, "time", lambda: now[0])
+    return now
+
+
+def make_cache(**kwargs):
+    return ResponseCache(memory=LRUCache(**kwargs), disk=DiskCache(":memory:", **kwargs))
+
+
+class OpenCircuit:
+    async def call(self, fn):
+        raise CircuitOpenError(30)
+
+
+def test_get_recipe_is_served_from_cache():
+    model = StubModel("recipe text")
+    responses = make_cache()
+    assert asyncio.run(get_recipe("pancakes", model=model, cache=responses, guard=None)) == "recipe text"
+    assert asyncio.run(get_recipe("pancakes", model=model, cache=responses, guard=None)) == "recipe text"
+    assert model.calls == 1
+    assert responses.stats == {"memory_hits": 1, "disk_hits": 0, "misses": 1}
+
+
+def test_cache_key_covers_prompt_and_config():
+    key = make_cache_key("model", {"temperature": 0.7}, "pancakes")
+    assert key == make_cache_key("model", {"temperature": 0.7}, "pancakes")
+    assert key != make_cache_key("model", {"temperature": 0.2}, "pancakes")
+    assert key != make_cache_key("model", {"temperature": 0.7}, "waffles")
+
+
+def test_expired_entries_miss_and_are_refetched(clock):
+    model = StubModel("first", "second")
+    responses = make_cache(ttl=60, stale_ttl=600)
+    asyncio.run(get_recipe("pancakes", model=model, cache=responses, guard=None))
+    clock[0] += 61
+    assert asyncio.run(get_recipe("pancakes", model=model, cache=responses, guard=None)) == "second"
+    assert model.calls == 2
+
+
+def test_stale_entry_served_while_circuit_is_open(clock):
+    responses = make_cache(ttl=60, stale_ttl=600)
+    asyncio.run(get_recipe("pancakes", model=StubModel("cached"), cache=responses, guard=None))
+    clock[0] += 120
+    assert asyncio.run(get_recipe("pancakes", model=StubModel(), cache=responses, guard=OpenCircuit())) == "cached"
+
+    clock[0] += 600
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(get_recipe("pancakes", model=StubModel(), cache=responses, guard=OpenCircuit()))
+
+
+def test_memory_tier_evicts_least_recently_used():
+    memory = LRUCache(max_entries=2)
+    memory.set("a", "1")
+    memory.set("b", "2")
+    memory.get("a")
+    memory.set("c", "3")
+    assert memory.get("b") is None
+    assert memory.get("a") == "1" and memory.get("c") == "3"
+
+
+def test_disk_tier_evicts_least_recently_accessed(clock):
+    disk = DiskCache(":memory:", max_entries=2)
+    for key in ("a", "b"):
+        clock[0] += 1
+        disk.set(key, key.upper())
+    clock[0] += 1
+    disk.get("a")
+    clock[0] += 1
+    disk.set("c", "C")
+    assert len(disk) == 2
+    assert disk.get("b") is None
+    assert disk.get("a")[0] == "A"
+
+
+def test_disk_hits_are_promoted_to_memory():
+    responses = make_cache()
+    responses.set("key", "value")
+    responses.memory.clear()
+    assert responses.get("key") == "value"
+    assert responses.get("key") == "value"
+    assert responses.stats == {"memory_hits": 1, "disk_hits": 1, "misses": 0}
+    assert responses.hit_rate() == 1.0
+
+
+def test_disk_file_is_shared_between_processes(tmp_path):
+    path = str(tmp_path / "responses.sqlite3")
+    ResponseCache(disk=DiskCache(path)).set("key", "value")
+    other = ResponseCache(disk=DiskCache(path))
+    assert other.get("key") == "value"
+    assert other.stats["disk_hits"] == 1
+
+
+class SlowDisk(DiskCache):
+    # A disk tier waiting on another process's write lock
+    def get(self, key, allow_stale=False):
+        time.sleep(0.3)
+        return super().get(key, allow_stale)
+
+    def set(self, key, value):
+        time.sleep(0.3)
+        super().set(key, value)
+
+
+def test_disk_tier_does_not_block_the_event_loop():
+    responses = ResponseCache(disk=SlowDisk(":memory:"))
+    ticks = []
+
+    async def ticker():
+        for _ in range(20):
+            ticks.append(time.perf_counter())
+            await asyncio.sleep(0.02)
+
+    async def main():
+        ticking = asyncio.ensure_future(ticker())
+        text = await get_recipe("pancakes", model=StubModel("recipe text"), cache=responses, guard=None)
+        await ticking
+        return text
+
+    assert asyncio.run(main()) == "recipe text"
+    assert max(later - earlier for earlier, later in zip(ticks, ticks[1:])) < 0.2
+    assert len(responses.disk) == 1
+
+
+def test_disk_tier_trims_every_percent_of_max_entries(clock):
+    disk = DiskCache(":memory:", max_entries=200)
+    for index in range(201):
+        clock[0] += 1
+        disk.set(str(index), "value")
+    assert len(disk) == 201
+    clock[0] += 1
+    disk.set("last", "value")
+    assert len(disk) == 200
+    assert disk.get("0") is None and disk.get("1") is None
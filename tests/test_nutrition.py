@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+
+from nutrition import FOOD_NAMES, NUTRIENTS, parse_quantity, parse_ingredient, match_food, nutrition_per_serving, recipe_nutrition
+
+
+@pytest.mark.parametrize("line, quantity", [
+    ("2 1/2 cups flour", (2.5, "cups", "flour")),
+    ("½ cup sugar", (0.5, "cup", "sugar")),
+    ("1½ cups milk", (1.5, "cups", "milk")),
+    ("1.5 kg potatoes", (1.5, "kg", "potatoes")),
+    ("200g chicken breast", (200.0, "g", "chicken breast")),
+    ("2-3 cloves garlic", (2.5, "cloves", "garlic")),
+    ("1 to 2 tbsp olive oil", (1.5, "tbsp", "olive oil")),
+    ("1 (14 oz) can tomatoes", (14.0, "oz", "tomatoes")),
+    ("3 large eggs", (3.0, None, "large eggs")),
+    ("- 2 carrots", (2.0, None, "carrots")),
+    ("Flour: 2 cups", (2.0, "cups", "Flour")),
+    ("Chicken breast - 500g", (500.0, "g", "Chicken breast")),
+    ("salt to taste", (None, None, "salt to taste")),
+])
+def test_parse_quantity(line, quantity):
+    assert parse_quantity(line) == quantity
+
+
+@pytest.mark.parametrize("name, food", [
+    ("flour", "flour"),
+    ("all-purpose flour, sifted", "flour"),
+    ("tomatoes", "tomato"),
+    ("carrots", "carrot"),
+    ("large eggs", "egg"),
+    ("ground beef", "ground beef"),
+    ("boneless chicken breast", "chicken breast"),
+    ("egg noodles", "noodles"),
+])
+def test_match_food(name, food):
+    assert FOOD_NAMES[match_food(name)] == food
+
+
+def test_unknown_food_is_not_matched():
+    assert match_food("unobtainium dust") == -1
+
+
+@pytest.mark.parametrize("line, grams", [
+    ("200g chicken breast", 200.0),
+    ("1 lb ground beef", 453.6),
+    ("2 cups flour", 250.0),
+    ("1 tomato", 123.0),
+    ("1 (14 oz) can tomatoes", 396.9),
+    ("salt to taste", 0.0),
+])
+def test_parse_ingredient_weighs_the_line(line, grams):
+    assert parse_ingredient(line)[1] == pytest.approx(grams)
+
+
+def test_lines_without_an_amount_count_as_covered():
+    facts, coverage = recipe_nutrition(["2 cups flour", "salt to taste", "unobtainium dust"], servings=2)
+    assert coverage == pytest.approx(2 / 3)
+    assert facts["Calories"] == "455 kcal"
+
+
+def test_batch_totals_equal_per_recipe_totals():
+    recipes = [
+        ["2 cups flour", "3 large eggs", "1 cup milk"],
+        [],
+        ["1 lb ground beef", "1 (14 oz) can tomatoes", "2-3 cloves garlic", "salt to taste"],
+        ["unobtainium dust", "200g chicken breast"],
+    ]
+    servings = [4, None, 6, 2]
+    values, coverage = nutrition_per_serving(recipes, servings)
+    assert values.shape == (len(recipes), len(NUTRIENTS))
+    for index, ingredients in enumerate(recipes):
+        single, single_coverage = nutrition_per_serving([ingredients], [servings[index]])
+        assert np.allclose(values[index], single[0])
+        assert coverage[index] == pytest.approx(single_coverage[0])
+    assert not values[1].any()
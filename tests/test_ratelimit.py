@@ -0,0 +1,211 @@
+import time
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+import ratelimit
+from event_loop import BackgroundLoop
+from generator import stream_recipe
+from ratelimit import TokenBucket, SQLiteTokenBucket, UpstreamGuard, CircuitBreaker, CircuitOpenError
+from stubs import StubModel
+
+TEXT = "Dish: Pancakes\nStep 1: Mix the batter (2 minutes)\nStep 2: Fry (3 minutes)\n"
+
+
+def stalled_stream(guard, chunk_delay=60):
+    return stream_recipe("pancakes", model=StubModel(TEXT, chunk_delay=chunk_delay), cache=None, inflight=None, guard=guard)
+
+
+def test_deadline_covers_the_whole_stream():
+    guard = UpstreamGuard(breaker=CircuitBreaker(threshold=1), timeout=0.2)
+
+    async def main():
+        return [chunk async for chunk in stalled_stream(guard)]
+
+    start = time.perf_counter()
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(main())
+    assert time.perf_counter() - start < 2
+    assert guard.breaker.state == "open"
+
+
+def test_stalled_stream_does_not_block_the_reading_thread():
+    loop = BackgroundLoop(name="test-loop")
+    try:
+        with pytest.raises(asyncio.TimeoutError):
+            list(loop.iterate(stalled_stream(UpstreamGuard(timeout=0.2))))
+    finally:
+        loop.stop()
+
+
+def test_streams_within_the_deadline_complete():
+    async def main():
+        return "".join([chunk async for chunk in stalled_stream(UpstreamGuard(timeout=5), chunk_delay=0.001)])
+
+    assert asyncio.run(main()) == TEXT
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    # Only ratelimit's clock; asyncio keeps the real one
+    now = [1_000_000.0]
+    monkeypatch.setattr(ratelimit, "time", SimpleNamespace(monotonic=lambda: now[0], time=lambda: now[0], perf_counter=lambda: now[0]))
+    return now
+
+
+class UpstreamError(Exception):
+    def __init__(self, code):
+        super().__init__(f"HTTP {code}")
+        self.code = code
+
+
+class Flaky:
+    # Raises the given errors in turn, then returns "ok"
+    def __init__(self, *errors):
+        self.errors = list(errors)
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return "ok"
+
+
+def call(guard, fn):
+    return asyncio.run(guard.call(fn))
+
+
+@pytest.mark.parametrize("bucket", ["memory", "sqlite"])
+def test_token_bucket_refills_at_the_configured_rate(clock, tmp_path, bucket):
+    if bucket == "memory":
+        limiter = TokenBucket(rate_per_minute=60, capacity=2)
+    else:
+        limiter = SQLiteTokenBucket(str(tmp_path / "limits.sqlite3"), rate_per_minute=60, capacity=2)
+    assert limiter._take() == 0 and limiter._take() == 0
+    assert limiter._take() == pytest.approx(1.0)
+    clock[0] += 0.5
+    assert limiter._take() == pytest.approx(0.5)
+    clock[0] += 0.5
+    assert limiter._take() == 0
+    # An idle bucket refills only up to its burst capacity
+    clock[0] += 60
+    assert limiter._take() == 0 and limiter._take() == 0
+    assert limiter._take() == pytest.approx(1.0)
+
+
+def test_sqlite_buckets_share_one_quota(clock, tmp_path):
+    path = str(tmp_path / "limits.sqlite3")
+    first, second = SQLiteTokenBucket(path, rate_per_minute=30, capacity=1), SQLiteTokenBucket(path, rate_per_minute=30, capacity=1)
+    assert first._take() == 0
+    assert second._take() == pytest.approx(2.0)
+
+
+@pytest.mark.parametrize("error", [UpstreamError(429), UpstreamError(503), asyncio.TimeoutError(), ConnectionError()])
+def test_retryable_errors_are_retried(error):
+    guard = UpstreamGuard(max_retries=2, base_delay=0)
+    fn = Flaky(error, error)
+    assert call(guard, fn) == "ok"
+    assert fn.calls == 3
+    assert guard.stats == {"calls": 3, "retries": 2, "failures": 0, "rejected": 0}
+
+
+def test_retries_stop_at_max_retries():
+    guard = UpstreamGuard(max_retries=2, base_delay=0)
+    fn = Flaky(*[UpstreamError(503)] * 5)
+    with pytest.raises(UpstreamError):
+        call(guard, fn)
+    assert fn.calls == 3
+    assert guard.stats["failures"] == 1
+
+
+@pytest.mark.parametrize("error", [UpstreamError(400), UpstreamError(403), ValueError("bad prompt")])
+def test_other_errors_are_not_retried(error):
+    guard = UpstreamGuard(breaker=CircuitBreaker(threshold=1), max_retries=2, base_delay=0)
+    fn = Flaky(error)
+    with pytest.raises(type(error)):
+        call(guard, fn)
+    assert fn.calls == 1
+    # The upstream answered, so the breaker stays closed
+    assert guard.breaker.state == "closed"
+
+
+def test_slow_attempts_time_out_and_are_retried():
+    guard = UpstreamGuard(max_retries=1, timeout=0.05, base_delay=0)
+    calls = []
+
+    async def fn():
+        calls.append(1)
+        if len(calls) == 1:
+            await asyncio.sleep(10)
+        return "ok"
+
+    assert call(guard, fn) == "ok"
+    assert guard.stats["retries"] == 1
+
+
+def test_breaker_opens_half_opens_and_closes(clock):
+    breaker = CircuitBreaker(threshold=2, reset_timeout=30)
+    breaker.record_failure()
+    assert breaker.state == "closed"
+    breaker.record_failure()
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpenError) as raised:
+        breaker.check()
+    assert raised.value.retry_after == 30
+    clock[0] += 30
+    assert breaker.state == "half-open"
+    breaker.check()
+    # Only one trial call at a time
+    with pytest.raises(CircuitOpenError):
+        breaker.check()
+    breaker.record_success()
+    assert breaker.state == "closed"
+    breaker.check()
+
+
+def test_failed_trial_reopens_the_breaker(clock):
+    breaker = CircuitBreaker(threshold=1, reset_timeout=30)
+    breaker.record_failure()
+    clock[0] += 30
+    breaker.check()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    clock[0] += 29
+    with pytest.raises(CircuitOpenError):
+        breaker.check()
+    clock[0] += 1
+    breaker.check()
+
+
+def test_open_breaker_rejects_calls_without_reaching_the_upstream(clock):
+    guard = UpstreamGuard(breaker=CircuitBreaker(threshold=1), max_retries=3, base_delay=0)
+    fn = Flaky(*[UpstreamError(503)] * 5)
+    with pytest.raises(CircuitOpenError):
+        call(guard, fn)
+    assert fn.calls == 1
+    with pytest.raises(CircuitOpenError):
+        call(guard, fn)
+    assert fn.calls == 1
+    assert guard.stats["rejected"] == 2
+
+
+def test_cancelled_trial_lets_the_next_caller_try(clock):
+    guard = UpstreamGuard(breaker=CircuitBreaker(threshold=1, reset_timeout=30), timeout=None)
+    guard.breaker.record_failure()
+    clock[0] += 30
+
+    async def main():
+        task = asyncio.ensure_future(guard.call(lambda: asyncio.sleep(10)))
+        await asyncio.sleep(0.01)
+        assert guard.breaker.trial_running
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(main())
+    assert not guard.breaker.trial_running
+    assert guard.breaker.state == "half-open"
+    assert call(guard, Flaky()) == "ok"
+    assert guard.breaker.state == "closed"
@@ -0,0 +1,56 @@
+import pytest
+
+from recipe_parser import parse_duration, parse_recipe, extract_suggested_dishes
+
+
+@pytest.mark.parametrize("text, seconds", [
+    ("Whisk the eggs (2 minutes)", 120),
+    ("Season and serve (30 seconds)", 30),
+    ("Bake for 30-35 minutes.", 1800),
+    ("Let cool completely. (1 hour)", 3600),
+    ("Boil (2.5 minutes)", 150),
+    ("Simmer (about 1 1/2 hours)", 5400),
+    ("Leave to cool (1/2 hour)", 1800),
+    ("Braise (1 1/2 - 2 hours)", 5400),
+    ("Simmer 1 hour 30 minutes", 5400),
+    ("Rest the meat 1 hr, 15 mins before slicing", 4500),
+    ("Reduce the sauce for 2 minutes and 30 seconds", 150),
+    ("Preheat oven to 350°F (175°C). (10 minutes)", 600),
+    ("Knead the dough well", 0),
+])
+def test_parse_duration(text, seconds):
+    assert parse_duration(text) == seconds
+
+
+def test_units_only_add_up_from_larger_to_smaller():
+    assert parse_duration("Stir 2 minutes 3 minutes") == 120
+
+
+def test_steps_get_compound_durations():
+    recipe = parse_recipe("Dish: Short Ribs\nIngredients: ribs, wine\nStep 1: Simmer (about 1 1/2 hours)\nStep 2: Braise 1 hour 30 minutes\n")
+    assert [step.seconds for step in recipe.steps] == [5400, 5400]
+
+
+SUGGESTIONS = """Here are three spring dishes:
+
+1. **Spring Pea Risotto** - A creamy risotto with fresh peas.
+   Key ingredients:
+   1. peas
+   2. rice
+   3. parmesan
+2. **Asparagus Tart** - Flaky pastry with asparagus and ricotta.
+3. **Lemon Herb Chicken** - Roast chicken with lemon and thyme.
+"""
+
+
+@pytest.mark.parametrize("text, dishes", [
+    (SUGGESTIONS, ["Spring Pea Risotto", "Asparagus Tart", "Lemon Herb Chicken"]),
+    (SUGGESTIONS.replace("1. **Spring Pea Risotto** - ", "**1. Spring Pea Risotto**\n"), ["Spring Pea Risotto", "Asparagus Tart", "Lemon Herb Chicken"]),
+    ("### Recipe 1: Lamb Tagine\nSlow cooked.\n### Recipe 2: Fish Tacos\nQuick.\n", ["Lamb Tagine", "Fish Tacos"]),
+    ("1. Pad Thai\n2. Shakshuka\n3. Banana Bread\n4. Beef Stew\n", ["Pad Thai", "Shakshuka", "Banana Bread"]),
+    ("1. Spring Pea Risotto\nA creamy risotto.\n   1. peas\n   2. asparagus\n2. Asparagus Tart\n3. Lemon Herb Chicken\n",
+     ["Spring Pea Risotto", "Asparagus Tart", "Lemon Herb Chicken"]),
+    ("Dish Name: Minestrone Soup\nA hearty soup.\nDish Name: Fish Tacos\n", ["Minestrone Soup", "Fish Tacos"]),
+])
+def test_extract_suggested_dishes(text, dishes):
+    assert extract_suggested_dishes(text) == dishes
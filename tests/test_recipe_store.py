@@ -0,0 +1,19 @@
+from prompts import canonical_request
+from recipe_parser import parse_recipe
+from recipe_store import RecipeStore, recipe_record, request_subject
+
+UNTITLED = "Ingredients: 2 cups flour, 3 eggs\nStep 1: Mix the batter (2 minutes)\n"
+
+
+def test_untitled_ingredients_recipe_is_stored_under_its_ingredients():
+    store = RecipeStore(":memory:")
+    request = canonical_request("By Ingredients", "flour, eggs")
+    record = recipe_record(request, UNTITLED, parse_recipe(UNTITLED))
+    assert record["title"] == "eggs, flour"
+    assert store.add(record)
+    assert [row["title"] for row in store.search("flour")] == ["eggs, flour"]
+
+
+def test_request_subject_reads_like_the_user_input():
+    assert request_subject(canonical_request("By Dish Name", "Chocolate Cake")) == "chocolate cake"
+    assert request_subject(canonical_request("By Ingredients", "Flour,  eggs")) == "eggs, flour"
@@ -0,0 +1,24 @@
+from similarity import IngredientIndex
+
+PANCAKES = ["flour", "eggs", "milk", "butter", "sugar"]
+
+
+def test_similar_sets_match_only_with_equal_constraints():
+    index = IngredientIndex(threshold=0.8)
+    index.add(PANCAKES, "pancakes", ("vegetarian",))
+    assert index.query(PANCAKES + ["salt"], ("vegetarian",)) == ("pancakes", 5 / 6)
+    assert index.query(PANCAKES, ("vegan",)) is None
+
+
+def test_index_evicts_least_recently_used_entries():
+    index = IngredientIndex(max_entries=2)
+    index.add(PANCAKES, "pancakes")
+    index.add(["rice", "peas", "stock", "onion", "parmesan"], "risotto")
+    assert index.query(PANCAKES) is not None
+    index.add(["tortilla", "fish", "lime", "cabbage", "chili"], "tacos")
+    assert len(index) == 2
+    assert index.query(["rice", "peas", "stock", "onion", "parmesan"]) is None
+    assert index.query(PANCAKES)[0] == "pancakes"
+    # Evicted entries leave no band keys behind
+    assert all(index._buckets.values())
+    assert {entry_id for bucket in index._buckets.values() for entry_id in bucket} == set(index._entries)
@@ -0,0 +1,145 @@
+import asyncio
+
+import pytest
+
+from singleflight import SingleFlight, LeaderAbandoned
+from generator import get_recipe, stream_recipe
+from stubs import StubModel
+
+
+class Upstream:
+    def __init__(self, result="recipe", delay=0.05):
+        self.result = result
+        self.delay = delay
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if isinstance(self.result, Exception):
+            raise self.result
+        return self.result
+
+
+def test_concurrent_calls_share_one_upstream_call():
+    async def main():
+        flight, upstream = SingleFlight(), Upstream()
+        results = await asyncio.gather(*(flight.do("key", upstream) for _ in range(5)))
+        return flight, upstream, results
+
+    flight, upstream, results = asyncio.run(main())
+    assert results == ["recipe"] * 5
+    assert upstream.calls == 1
+    assert flight.stats == {"leaders": 1, "coalesced": 4, "errors": 0}
+    assert len(flight) == 0
+
+
+def test_different_keys_are_not_coalesced():
+    async def main():
+        flight, upstream = SingleFlight(), Upstream()
+        await asyncio.gather(flight.do("a", upstream), flight.do("b", upstream))
+        return upstream
+
+    assert asyncio.run(main()).calls == 2
+
+
+def test_error_is_propagated_to_followers():
+    async def main():
+        flight, upstream = SingleFlight(), Upstream(ValueError("upstream failed"))
+        results = await asyncio.gather(*(flight.do("key", upstream) for _ in range(3)), return_exceptions=True)
+        return flight, upstream, results
+
+    flight, upstream, results = asyncio.run(main())
+    assert all(isinstance(result, ValueError) for result in results)
+    assert upstream.calls == 1
+    assert flight.stats["errors"] == 1
+    assert len(flight) == 0
+
+
+def test_followers_retry_when_the_leader_is_cancelled():
+    async def main():
+        flight, upstream = SingleFlight(), Upstream()
+        leader = asyncio.create_task(flight.do("key", upstream))
+        await asyncio.sleep(0)
+        followers = [asyncio.create_task(flight.do("key", upstream)) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        results = await asyncio.gather(*followers)
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return flight, upstream, results
+
+    flight, upstream, results = asyncio.run(main())
+    assert results == ["recipe"] * 3
+    # One follower took over as leader; the others joined its call
+    assert upstream.calls == 2
+    assert flight.stats["errors"] == 0
+
+
+def test_abandoned_future_raises_leader_abandoned():
+    async def main():
+        flight = SingleFlight()
+        future = flight.begin("key")
+        pending = flight.join("key")
+        flight.finish("key", future, error=asyncio.CancelledError())
+        with pytest.raises(LeaderAbandoned):
+            await pending
+
+    asyncio.run(main())
+
+
+async def consume(agen):
+    return "".join([chunk async for chunk in agen])
+
+
+def test_get_recipe_follows_a_streaming_leader():
+    text = "Dish: Pancakes\nStep 1: Mix the batter (2 minutes)\nStep 2: Fry (3 minutes)\n"
+
+    async def main():
+        flight, model = SingleFlight(), StubModel(text, chunk_delay=0.01)
+        stream = asyncio.create_task(consume(stream_recipe("pancakes", model=model, cache=None, inflight=flight, guard=None)))
+        await asyncio.sleep(0.005)
+        followers = await asyncio.gather(
+            get_recipe("pancakes", model=model, cache=None, inflight=flight, guard=None),
+            consume(stream_recipe("pancakes", model=model, cache=None, inflight=flight, guard=None)),
+        )
+        return model, await stream, followers
+
+    model, streamed, followers = asyncio.run(main())
+    assert streamed == text
+    assert followers == [text, text]
+    assert model.calls == 1
+
+
+def test_stream_followers_regenerate_when_the_reader_stops():
+    text = "Dish: Pancakes\nStep 1: Mix the batter (2 minutes)\n"
+
+    async def main():
+        flight, model = SingleFlight(), StubModel(text, chunk_delay=0.01)
+        leader = stream_recipe("pancakes", model=model, cache=None, inflight=flight, guard=None)
+        await leader.__anext__()
+        follower = asyncio.create_task(get_recipe("pancakes", model=model, cache=None, inflight=flight, guard=None))
+        await asyncio.sleep(0.005)
+        # The page stopped reading, e.g. the session went away mid-stream
+        await leader.aclose()
+        return model, await follower
+
+    model, result = asyncio.run(main())
+    assert result == text
+    assert model.calls == 2
+
+
+def test_stream_error_is_propagated_to_followers():
+    async def main():
+        flight, model = SingleFlight(), StubModel(ValueError("upstream failed"), delay=0.02)
+        results = await asyncio.gather(
+            consume(stream_recipe("pancakes", model=model, cache=None, inflight=flight, guard=None)),
+            get_recipe("pancakes", model=model, cache=None, inflight=flight, guard=None),
+            return_exceptions=True,
+        )
+        return flight, model, results
+
+    flight, model, results = asyncio.run(main())
+    assert all(isinstance(result, ValueError) for result in results)
+    assert model.calls == 1
+    assert len(flight) == 0
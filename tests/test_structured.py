@@ -0,0 +1,69 @@
+import json
+import asyncio
+
+import pytest
+
+from cache import ResponseCache, DiskCache
+from generator import get_structured_recipe
+from recipe_parser import recipe_from_json
+from stubs import StubModel
+
+VALID = json.dumps({
+    "title": "Pancakes",
+    "servings": 4,
+    "ingredients": ["2 cups flour", "3 eggs", "1 cup milk"],
+    "steps": [{"instruction": "Mix the batter", "duration_seconds": 120}, {"instruction": "Fry", "duration_seconds": 180}],
+})
+TEXT = "Dish: Pancakes\nIngredients: 2 cups flour, 3 eggs\nStep 1: Mix the batter (2 minutes)\nStep 2: Fry (3 minutes)\n"
+
+
+def structured(model, responses):
+    return asyncio.run(get_structured_recipe("json prompt", fallback_prompt="text prompt", model=model, cache=responses, guard=None))
+
+
+@pytest.fixture
+def responses():
+    return ResponseCache(disk=DiskCache(":memory:"))
+
+
+def test_valid_json_is_used_and_cached(responses):
+    model = StubModel(VALID)
+    recipe = structured(model, responses)
+    assert recipe.title == "Pancakes" and recipe.servings == 4
+    assert [step.seconds for step in recipe.steps] == [120, 180]
+    structured(model, responses)
+    assert model.calls == 1
+
+
+def test_invalid_json_goes_through_the_text_parser(responses):
+    model = StubModel(TEXT)
+    recipe = structured(model, responses)
+    assert recipe.title == "Pancakes"
+    assert [step.seconds for step in recipe.steps] == [120, 180]
+    assert model.prompts == ["json prompt"]
+
+
+def test_invalid_json_is_not_cached(responses):
+    model = StubModel('{"title": "Pancakes", "steps": [', TEXT, VALID)
+    structured(model, responses)
+    assert model.prompts == ["json prompt", "text prompt"]
+    # The next request asks again instead of replaying the truncated payload
+    recipe = structured(model, responses)
+    assert model.prompts == ["json prompt", "text prompt", "json prompt"]
+    assert [step.seconds for step in recipe.steps] == [120, 180]
+    structured(model, responses)
+    assert model.calls == 3
+
+
+def test_unusable_payload_is_requested_again_in_text_mode(responses):
+    model = StubModel('{"error": "unsupported"}', TEXT)
+    recipe = structured(model, responses)
+    assert model.prompts == ["json prompt", "text prompt"]
+    assert len(recipe.steps) == 2
+
+
+@pytest.mark.parametrize("duration", ["1e400", "-5", "NaN", "Infinity", "true", "\"10\"", str(10 ** 400)])
+def test_invalid_durations_are_rejected(duration):
+    payload = '{"title": "Pancakes", "ingredients": [], "steps": [{"instruction": "Mix", "duration_seconds": %s}]}' % duration
+    with pytest.raises(ValueError):
+        recipe_from_json(payload)
@@ -0,0 +1,73 @@
+import pytest
+
+from timers import StepTimer, start_timer, pop_finished
+
+
+def test_running_timer_counts_down_from_its_deadline():
+    timer = StepTimer("Simmer", 90).start(now=1000)
+    assert timer.running
+    assert timer.remaining_at(1030) == 60
+    assert timer.display(1030) == "01:00"
+    assert timer.display(1030.5) == "01:00"
+    assert not timer.finished(1089)
+    assert timer.finished(1090)
+    assert timer.remaining_at(2000) == 0
+    assert timer.display(2000) == "00:00"
+
+
+def test_paused_timer_keeps_its_remaining_time():
+    timer = StepTimer("Simmer", 90).start(now=1000)
+    timer.pause(now=1030)
+    assert not timer.running
+    assert timer.remaining_at(5000) == 60
+    assert timer.display(5000) == "01:00"
+    timer.resume(now=5000)
+    assert timer.remaining_at(5045) == 15
+    assert timer.finished(5060)
+
+
+def test_finished_timer_does_not_resume():
+    timer = StepTimer("Rest", 10).start(now=0)
+    timer.pause(now=20)
+    timer.resume(now=30)
+    assert not timer.running
+    assert timer.finished(30)
+
+
+def test_restart_resets_the_timer():
+    timer = StepTimer("Rest", 10).start(now=0)
+    timer.notified = True
+    timer.pause(now=4)
+    timer.start(now=100)
+    assert timer.remaining_at(100) == 10
+    assert not timer.notified
+
+
+@pytest.mark.parametrize("seconds, text", [(0, "00:00"), (59.2, "01:00"), (600, "10:00"), (3725, "62:05")])
+def test_display(seconds, text):
+    assert StepTimer("Bake", seconds).display() == text
+
+
+def test_timer_ids_follow_the_step_key():
+    timers = {}
+    first = start_timer(timers, "Simmer the sauce until it thickens", 60, now=0, key="recipe-1 step 2")
+    second = start_timer(timers, "Simmer the sauce until it thickens", 60, now=0, key="recipe-2 step 2")
+    assert first.id != second.id
+    assert len(timers) == 2
+    again = start_timer(timers, "Simmer the sauce until it thickens", 30, now=10, key="recipe-1 step 2")
+    assert again.id == first.id and timers[first.id] is again
+    assert StepTimer("Simmer", 60).id == StepTimer("Simmer", 30).id
+
+
+def test_pop_finished_reports_each_timer_once():
+    timers = {}
+    short = start_timer(timers, "Whisk", 30, now=0)
+    long = start_timer(timers, "Bake", 600, now=0)
+    assert pop_finished(timers, now=10) == []
+    assert pop_finished(timers, now=30) == [short]
+    assert pop_finished(timers, now=60) == []
+    assert pop_finished(timers, now=600) == [long]
+    assert pop_finished(timers, now=700) == []
+    # A restarted timer is reported again when it next finishes
+    short.start(now=700)
+    assert pop_finished(timers, now=730) == [short]
@@ -0,0 +1,65 @@
+import math
+import time
+import zlib
+
+
+class StepTimer:
+    # Deadline-based timer: nothing sleeps, the remaining time is derived from the clock on each render
+    # key identifies the step the timer belongs to; the label alone is not unique across recipes on one page
+    def __init__(self, label, seconds, key=None):
+        self.id = f"{zlib.crc32((key or label).encode('utf-8')):08x}"
+        self.label = label
+        self.duration = seconds
+        self.remaining = seconds
+        self.deadline = None
+        self.notified = False
+
+    @property
+    def running(self):
+        return self.deadline is not None
+
+    def start(self, now=None):
+        now = time.time() if now is None else now
+        self.remaining = self.duration
+        self.deadline = now + self.duration
+        self.notified = False
+        return self
+
+    def pause(self, now=None):
+        if self.running:
+            self.remaining = self.remaining_at(now)
+            self.deadline = None
+
+    def resume(self, now=None):
+        if not self.running and self.remaining > 0:
+            now = time.time() if now is None else now
+            self.deadline = now + self.remaining
+
+    def remaining_at(self, now=None):
+        if not self.running:
+            return self.remaining
+        now = time.time() if now is None else now
+        return max(0.0, self.deadline - now)
+
+    def finished(self, now=None):
+        return self.remaining_at(now) <= 0
+
+    def display(self, now=None):
+        seconds = math.ceil(self.remaining_at(now))
+        return f"{seconds // 60:02d}:{seconds % 60:02d}"
+
+
+def start_timer(timers, label, seconds, now=None, key=None):
+    timer = StepTimer(label, seconds, key).start(now)
+    timers[timer.id] = timer
+    return timer
+
+
+def pop_finished(timers, now=None):
+    # Timers that reached zero since the last check; each is reported only once
+    finished = []
+    for timer in timers.values():
+        if not timer.notified and timer.finished(now):
+            timer.notified = True
+            finished.append(timer)
+    return finished